@@ -1,89 +1,284 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
-import sqlite3
 import os
-import json
+import io
+import secrets
+import tempfile
 
-app = FastAPI()
+import assets
+import fastjson
+import metrics
 
-# Mount static files (ensure directories exist)
-os.makedirs("static/css", exist_ok=True)
-os.makedirs("static/js", exist_ok=True)
-os.makedirs("static/images", exist_ok=True)
-os.makedirs("templates", exist_ok=True)
+app = FastAPI()
+if metrics.ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# CSS/JS are minified and fingerprinted into static/dist (rebuilt here when a
+# source changed and static/ is writable); templates link them through
+# asset_url(). Nothing is created on disk otherwise, so a read-only
+# checkout can serve
+app.mount("/static", assets.AssetFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = assets.url_for(assets.load_manifest()["assets"])
+
+# Storage backend from LMT_STORAGE: the SQLite file (default, queries run on
+# the threadpool) or a shared PostgreSQL pool; see repository.py
+import repository
+
+repo = repository.create_repository()
+
+import database
+import queries
+import search
+import ingest
+import read_model
+from page_cache import PageCache
+
+page_cache = PageCache()
+# API bodies are cached pre-serialized too; query strings vary far more than
+# pages do, so they get cheap compression levels
+api_cache = PageCache(gzip_level=6, brotli_quality=4)
+prep_model = read_model.PrepReadModel()
+
+@app.on_event("shutdown")
+async def close_repo():
+    await repo.close()
+
+async def cached_page(request, key, render):
+    """Serve a rendered page from memory while the data version is unchanged.
+
+    Conditional requests for a cached page are answered with 304 straight
+    from the cache, without a query or a template render. A miss renders
+    and compresses off the event loop, once for all requests waiting on it.
+    """
+    version = await repo.data_version()
+    page = await page_cache.fetch(key, version, render)
+    if page is None:
+        return None
+    return page_cache.respond(request, page)
+
+async def cached_json(request, produce):
+    """Serve an API response as cached, pre-serialized and pre-compressed JSON.
+
+    Keyed on the path and raw query string, and invalidated like pages by
+    the data version.
+    """
+    key = (request.url.path, request.url.query)
+    version = await repo.data_version()
+
+    async def body():
+        return fastjson.dumps(await produce())
+    page = await api_cache.fetch(key, version, body)
+    return api_cache.respond(request, page, media_type="application/json")
+
+def list_payload(items, fields, format):
+    if format == "columnar":
+        return {"fields": list(fields), "count": len(items), "columns": queries.columnar(items, fields)}
+    return items
+
+def parse_fields(fields, allowed, default):
+    try:
+        return queries.parse_fields(fields, allowed, default)
+    except queries.InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-# Global In-Memory Database Connection
-db_connection = sqlite3.connect(":memory:", check_same_thread=False)
-db_connection.row_factory = sqlite3.Row
+FIELDS_DESCRIPTION = "Comma-separated fields to return"
+FORMAT_DESCRIPTION = "objects (a list of rows) or columnar (one array per field)"
 
-# Initialize DB with Seed Data
-from database import init_db
-init_db(db_connection)
+async def prep_snapshot():
+    # Decoded prep materials, reloaded only when the data version moves
+    version = await repo.data_version()
+    if not prep_model.current(version):
+        prep_model.update(version, await repo.load_prep())
+    return prep_model
 
-def get_db_connection():
-    # Return the shared in-memory connection
-    return db_connection
+def _render_template(name, context):
+    with metrics.time_template(name):
+        return templates.get_template(name).render(**context)
+
+async def render_template(name, **context):
+    # Jinja renders on the threadpool: a large page would otherwise hold up
+    # every other request on the event loop
+    return await run_in_threadpool(_render_template, name, context)
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    with metrics.time_template("index.html"):
+        return templates.TemplateResponse(request, "index.html")
 
 @app.get("/api/jobs")
-async def get_jobs():
-    jobs = db_connection.execute('SELECT * FROM jobs').fetchall()
-    # No close() necessary for shared memory connection
-    return [dict(job) for job in jobs]
+async def get_jobs(
+    request: Request,
+    q: str | None = None,
+    company: str | None = None,
+    location: str | None = None,
+    type: str | None = None,
+    posted_since: int | None = Query(None, ge=0, le=ingest.MAX_TIMESTAMP,
+                                     description="Unix timestamp; only jobs posted at or after it"),
+    min_salary: int | None = Query(None, ge=0, le=database.MAX_INTEGER,
+                                   description="Jobs whose salary range reaches at least this; needs currency"),
+    max_salary: int | None = Query(None, ge=0, le=database.MAX_INTEGER,
+                                   description="Jobs whose salary range starts at or below this; needs currency"),
+    currency: str | None = Query(None, pattern="^[A-Za-z]{3}$",
+                                 description="ISO code the salary bounds are in; amounts are not converted"),
+    skill: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(queries.DEFAULT_PAGE_SIZE, ge=1, le=queries.MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    format: str = Query("objects", pattern="^(objects|columnar)$", description=FORMAT_DESCRIPTION),
+):
+    selected = parse_fields(fields, queries.JOB_FIELDS, queries.JOB_LIST_FIELDS)
+    if (min_salary is not None or max_salary is not None) and not currency:
+        # Without it, USD and INR ranges would be compared as plain numbers
+        raise HTTPException(status_code=400, detail="min_salary/max_salary need a currency, e.g. currency=INR")
+
+    async def produce():
+        try:
+            items, next_cursor = await repo.list_jobs(
+                q=q, company=company, location=location, job_type=type,
+                posted_since=posted_since, min_salary=min_salary, max_salary=max_salary,
+                currency=currency, skill=skill, cursor=cursor, limit=limit, fields=selected,
+            )
+        except queries.InvalidCursor as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        if format == "columnar":
+            return {**list_payload(items, selected, format), "next_cursor": next_cursor}
+        return {"items": items, "next_cursor": next_cursor}
+    return await cached_json(request, produce)
+
+@app.get("/api/search")
+async def search_all(
+    request: Request,
+    q: str = "",
+    scope: str = Query("all", pattern="^(all|jobs|prep)$"),
+    limit: int = Query(search.DEFAULT_LIMIT, ge=1, le=search.MAX_LIMIT),
+    prefix: bool = True,
+    facets: str | None = Query(None, description="Comma-separated facets to count: company, type, category"),
+):
+    selected = parse_fields(facets, search.FACET_NAMES, ())
+
+    async def produce():
+        return await repo.search(q, scope=scope, limit=limit, prefix=prefix, facets=selected)
+    return await cached_json(request, produce)
+
+ADMIN_TOKEN = os.environ.get("LMT_ADMIN_TOKEN")
+
+def require_admin(authorization):
+    # Admin endpoints are disabled unless LMT_ADMIN_TOKEN is configured
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/api/admin/jobs/ingest")
+async def ingest_jobs(
+    request: Request,
+    format: str | None = Query(None, pattern="^(jsonl|csv)$"),
+    batch_size: int = Query(ingest.BATCH_SIZE, ge=100, le=500000),
+    authorization: str | None = Header(None),
+):
+    require_admin(authorization)
+    fmt = format or ingest.detect_format(None, request.headers.get("content-type"))
+
+    # Spool the upload (memory first, disk past 8 MB) so the feed is never
+    # held in memory whole, then upsert it on the writer connection
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        async for chunk in request.stream():
+            # Past 8 MB this is a disk write; keep it off the event loop
+            await run_in_threadpool(spool.write, chunk)
+        spool.seek(0)
+        stream = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        try:
+            report = await repo.ingest(stream, fmt, batch_size)
+        finally:
+            stream.detach()
+    return report
 
 @app.get("/api/prep")
-async def get_prep():
-    prep = db_connection.execute('SELECT * FROM prep_materials').fetchall()
-    # No close()
-    return [dict(p) for p in prep]
+async def get_prep(
+    request: Request,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    format: str = Query("objects", pattern="^(objects|columnar)$", description=FORMAT_DESCRIPTION),
+):
+    selected = parse_fields(fields, read_model.PREP_SUMMARY_FIELDS, read_model.PREP_SUMMARY_FIELDS)
+
+    async def produce():
+        items = (await prep_snapshot()).summaries
+        if selected != read_model.PREP_SUMMARY_FIELDS:
+            items = [{field: item[field] for field in selected} for item in items]
+        return list_payload(items, selected, format)
+    return await cached_json(request, produce)
 
 @app.get("/api/companies")
-async def get_companies():
-    companies = db_connection.execute('SELECT * FROM companies').fetchall()
-    # No close()
-    return [dict(c) for c in companies]
+async def get_companies(
+    request: Request,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    format: str = Query("objects", pattern="^(objects|columnar)$", description=FORMAT_DESCRIPTION),
+):
+    selected = parse_fields(fields, queries.COMPANY_FIELDS, queries.COMPANY_FIELDS)
+
+    async def produce():
+        return list_payload(await repo.list_companies(selected), selected, format)
+    return await cached_json(request, produce)
+
+@app.get("/api/practice/topics")
+async def get_practice_topics(request: Request):
+    async def produce():
+        return await repo.practice_topics()
+    return await cached_json(request, produce)
+
+@app.get("/api/practice")
+async def get_practice(
+    request: Request,
+    topic: str,
+    difficulty: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(queries.PRACTICE_PAGE_SIZE, ge=1, le=queries.MAX_PAGE_SIZE),
+):
+    async def produce():
+        try:
+            items, next_cursor = await repo.list_practice(topic, difficulty=difficulty, cursor=cursor, limit=limit)
+        except queries.InvalidCursor as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        if items is None:
+            raise HTTPException(status_code=404, detail=f"Unknown topic: {topic!r}")
+        return {"topic": topic, "items": items, "next_cursor": next_cursor}
+    return await cached_json(request, produce)
 
 @app.get("/companies", response_class=HTMLResponse)
 async def companies_page(request: Request):
-    companies = db_connection.execute('SELECT * FROM companies').fetchall()
-    # No close()
-    return templates.TemplateResponse("companies.html", {"request": request, "companies": [dict(c) for c in companies]})
+    async def render():
+        companies = await repo.list_companies()
+        return await render_template("companies.html", companies=companies)
+    return await cached_page(request, ("companies",), render)
 
 @app.get("/practice", response_class=HTMLResponse)
 async def practice_page(request: Request):
-    problems = db_connection.execute('SELECT * FROM practice_problems').fetchall()
-    # No close()
-    
-    # Group problems by topic
-    grouped = {}
-    for p in problems:
-        p_dict = dict(p)
-        topic = p_dict['topic']
-        if topic not in grouped:
-            grouped[topic] = []
-        grouped[topic].append(p_dict)
-        
-    return templates.TemplateResponse("practice.html", {"request": request, "grouped_problems": grouped})
+    async def render():
+        # Topic headers and counts only; each topic's problems are fetched
+        # page by page from /api/practice as it scrolls into view
+        topics = await repo.practice_topics()
+        return await render_template("practice.html", topics=topics, page_size=queries.PRACTICE_PAGE_SIZE)
+    return await cached_page(request, ("practice",), render)
 
 @app.get("/prep/{prep_id}", response_class=HTMLResponse)
 async def prep_detail(request: Request, prep_id: int):
-    prep = db_connection.execute('SELECT * FROM prep_materials WHERE id = ?', (prep_id,)).fetchone()
-    # No close()
-    if prep:
-        p_dict = dict(prep)
-        # Parse JSON fields
-        p_dict['roadmap'] = json.loads(p_dict['roadmap'])
-        p_dict['questions'] = json.loads(p_dict['questions'])
-        return templates.TemplateResponse("prep_detail.html", {"request": request, "prep": p_dict})
-    return HTMLResponse(content="Preparation material not found", status_code=404)
+    async def render():
+        p_dict = (await prep_snapshot()).details.get(prep_id)
+        if not p_dict:
+            return None
+        return await render_template("prep_detail.html", prep=p_dict)
+    response = await cached_page(request, ("prep", prep_id), render)
+    if response is None:
+        return HTMLResponse(content="Preparation material not found", status_code=404)
+    return response
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.expose(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 if __name__ == "__main__":
     import uvicorn
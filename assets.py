@@ -0,0 +1,355 @@
+"""Asset pipeline: minified, content-hashed copies of static/ CSS and JS.
+
+`python assets.py` (or the first app start after a source edit) writes
+static/dist/ with one fingerprinted file per asset, its .gz/.br variants
+and manifest.json mapping logical names ("css/style.css") to them. If
+static/ is read-only at that point, the unhashed files are served.
+Templates refer to assets through `asset_url(name)`, never by path, so a
+changed file gets a new URL and the old one can be cached forever.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+from fastapi.responses import FileResponse, Response
+from fastapi.staticfiles import StaticFiles
+
+from page_cache import brotli, preferred_encoding
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Logical name (path under static/) of every asset the pipeline builds
+ASSETS = ('css/style.css', 'js/main.js')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+MEDIA_TYPES = {'.css': 'text/css; charset=utf-8', '.js': 'text/javascript; charset=utf-8'}
+
+# Bump when minify() output changes, so existing dist/ builds are redone
+PIPELINE_VERSION = 2
+
+# Strings, unquoted url() values and comments are matched first, so nothing
+# inside a string or URL is ever mistaken for a comment or rewritten
+_CSS_TOKENS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|url\((?:\\.|[^)"'\\])*\))|(/\*.*?\*/)''',
+                         re.DOTALL | re.IGNORECASE)
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,])\s*')
+
+
+def minify_css(text):
+    """Drop comments and redundant whitespace. Values are never rewritten."""
+    out = []
+    # Code on both sides of a dropped comment is minified as one piece
+    code = []
+    position = 0
+    for match in _CSS_TOKENS.finditer(text):
+        code.append(text[position:match.start()])
+        if match.group(1):
+            out.append(_minify_css_code(''.join(code)))
+            out.append(match.group(1))
+            code = []
+        position = match.end()
+    code.append(text[position:])
+    out.append(_minify_css_code(''.join(code)))
+    return ''.join(out).strip()
+
+
+def _minify_css_code(code):
+    code = _CSS_SPACE.sub(' ', code)
+    return _CSS_PUNCTUATION.sub(r'\1', code).replace(';}', '}')
+
+
+# Characters after which a "/" starts a regex literal rather than a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_JS_LINE_BREAK = re.compile(r'[ \t]*\n\s*')
+_REGEX_KEYWORD_END = re.compile(r'(?:^|[^\w$])(?:return|typeof|case|in|of|delete|void|throw|new)$')
+
+
+def _js_segments(text):
+    """Split JavaScript into ('code' | 'literal' | 'comment', text) segments.
+
+    Literals are strings, regexes and template literals, including
+    `${...}` expressions nested inside templates, which are code again.
+    """
+    segments = []
+    code_start = 0
+    i = 0
+    n = len(text)
+    # One entry per open template literal: the brace depth of its ${...}
+    templates = []
+    depth = 0
+
+    def flush(end):
+        if end > code_start:
+            segments.append(('code', text[code_start:end]))
+
+    def scan_template(start):
+        # From just inside a backtick up to the closing backtick or a "${"
+        j = start
+        while j < n:
+            if text[j] == '\\':
+                j += 2
+            elif text[j] == '`':
+                return j + 1, False
+            elif text.startswith('${', j):
+                return j + 2, True
+            else:
+                j += 1
+        return n, False
+
+    while i < n:
+        char = text[i]
+        if char in '"\'':
+            flush(i)
+            j = i + 1
+            while j < n and text[j] != char and text[j] != '\n':
+                j += 2 if text[j] == '\\' else 1
+            segments.append(('literal', text[i:j + 1]))
+            i = code_start = j + 1
+        elif char == '`' or (char == '}' and templates and depth == templates[-1]):
+            flush(i)
+            if char == '}':
+                templates.pop()
+            end, opened = scan_template(i + 1)
+            if opened:
+                templates.append(depth)
+            segments.append(('literal', text[i:end]))
+            i = code_start = end
+        elif text.startswith('//', i):
+            flush(i)
+            j = text.find('\n', i)
+            j = n if j == -1 else j
+            segments.append(('comment', text[i:j]))
+            i = code_start = j
+        elif text.startswith('/*', i):
+            flush(i)
+            j = text.find('*/', i + 2)
+            j = n if j == -1 else j + 2
+            segments.append(('comment', text[i:j]))
+            i = code_start = j
+        elif char == '/' and _starts_regex(text, code_start, i, segments):
+            flush(i)
+            j = i + 1
+            in_class = False
+            while j < n and text[j] != '\n':
+                if text[j] == '\\':
+                    j += 1
+                elif text[j] == '[':
+                    in_class = True
+                elif text[j] == ']':
+                    in_class = False
+                elif text[j] == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and text[j].isalpha():
+                j += 1
+            segments.append(('literal', text[i:j]))
+            i = code_start = j
+        else:
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            i += 1
+    flush(n)
+    return segments
+
+
+def _starts_regex(text, code_start, i, segments):
+    before = text[code_start:i].rstrip()
+    if not before:
+        # Right after a string or regex "/" divides; after a comment or at
+        # the start of the file it begins a regex
+        previous = next((kind for kind, _ in reversed(segments) if kind != 'comment'), None)
+        return previous != 'literal'
+    return before[-1] in _REGEX_PRECEDERS or _REGEX_KEYWORD_END.search(before) is not None
+
+
+def minify_js(text):
+    """Drop comments, indentation and blank lines from JavaScript.
+
+    Deliberately conservative: line breaks are kept (automatic semicolon
+    insertion depends on them) and strings, regexes and template literals
+    are copied byte for byte, so the result behaves exactly like the source.
+    """
+    out = []
+    code = []
+
+    def flush():
+        out.append(_JS_LINE_BREAK.sub('\n', ''.join(code)))
+        code.clear()
+
+    for kind, segment in _js_segments(text):
+        if kind == 'literal':
+            flush()
+            out.append(segment)
+        elif kind == 'comment':
+            # A block comment may be all that separates two tokens
+            code.append('\n' if '\n' in segment else ' ' if segment.startswith('/*') else '')
+        else:
+            code.append(segment)
+    flush()
+    return ''.join(out).strip() + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def minify(name, text):
+    minifier = MINIFIERS.get(os.path.splitext(name)[1])
+    return minifier(text) if minifier else text
+
+
+def fingerprint(name, content):
+    """"css/style.css" -> "css/style.<hash>.css" for the given content."""
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def compile_assets(static_dir=STATIC_DIR, transform=None):
+    """Yield (logical name, fingerprinted name, minified bytes) per asset.
+
+    `transform(name, text)` may rewrite a source before it is minified
+    (build_static uses it to retarget main.js at the flat site).
+    """
+    for name in ASSETS:
+        path = os.path.join(static_dir, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        if transform is not None:
+            text = transform(name, text)
+        content = minify(name, text).encode('utf-8')
+        yield name, fingerprint(name, content), content
+
+
+def write_atomic(path, content):
+    """Write `content` (str or bytes) to `path` via a temp file and a rename.
+
+    Readers, and a build that crashes halfway, never see a partial file.
+    Used for static/dist/ here and for docs/ by build_static.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        # mkstemp creates 0600; these are served, possibly by another process
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def source_digest(static_dir=STATIC_DIR):
+    digest = hashlib.sha256(str(PIPELINE_VERSION).encode())
+    for name in ASSETS:
+        path = os.path.join(static_dir, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+
+def build(static_dir=STATIC_DIR):
+    """Write static/dist/ and its manifest; returns the manifest."""
+    dist_dir = os.path.join(static_dir, DIST)
+    assets = {}
+    for name, hashed, content in compile_assets(static_dir):
+        path = os.path.join(dist_dir, hashed)
+        # Fingerprinted files never change, so existing ones are kept as is
+        if not os.path.exists(path):
+            write_atomic(path + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                write_atomic(path + '.br', brotli.compress(content, quality=11))
+            write_atomic(path, content)
+        assets[name] = f"{DIST}/{hashed}"
+    manifest = {'sources': source_digest(static_dir), 'assets': assets}
+    write_atomic(os.path.join(dist_dir, MANIFEST_NAME), json.dumps(manifest, indent=1).encode('utf-8'))
+    return manifest
+
+
+def load_manifest(static_dir=STATIC_DIR):
+    """The dist/ manifest, rebuilt first if any source changed since.
+
+    Where dist/ cannot be written (a read-only deploy without a build
+    step) the manifest is empty, so asset_url() serves the unhashed
+    sources instead of failing the app start.
+    """
+    try:
+        with open(os.path.join(static_dir, DIST, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        if manifest.get('sources') == source_digest(static_dir):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    try:
+        return build(static_dir)
+    except OSError:
+        return {'sources': None, 'assets': {}}
+
+
+def url_for(assets, prefix='/static/'):
+    """asset_url() for templates: logical name -> fingerprinted URL.
+
+    Names missing from the manifest fall back to the unhashed file.
+    """
+    def asset_url(name):
+        return prefix + assets.get(name, name)
+    return asset_url
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles that serves dist/ fingerprinted assets as immutable.
+
+    A dist/ file is sent as its precompressed .br or .gz sibling when the
+    client's Accept-Encoding allows it; everything else under static/ is
+    served as usual but revalidated on every use.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        full_path = os.fspath(full_path)
+        dist_dir = os.path.join(os.path.realpath(self.directory), DIST) + os.sep
+        if not full_path.startswith(dist_dir) or full_path.endswith(('.gz', '.br', '.json')):
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            response.headers.setdefault('Cache-Control', 'no-cache')
+            return response
+
+        accept_encoding = ''
+        for key, value in scope.get('headers', ()):
+            if key == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
+        available = [encoding for encoding, suffix in (('br', '.br'), ('gzip', '.gz'))
+                     if os.path.isfile(full_path + suffix)]
+        encoding = preferred_encoding(accept_encoding, available)
+        headers = {'Cache-Control': IMMUTABLE, 'Vary': 'Accept-Encoding'}
+        path = full_path
+        if encoding != 'identity':
+            path += '.br' if encoding == 'br' else '.gz'
+            headers['Content-Encoding'] = encoding
+            stat_result = os.stat(path)
+        # The URL names the content, so any revalidation is a match
+        if any(key in (b'if-none-match', b'if-modified-since') for key, _ in scope.get('headers', ())):
+            return Response(status_code=304, headers=headers)
+        return FileResponse(path, status_code=status_code, headers=headers,
+                            media_type=MEDIA_TYPES.get(os.path.splitext(full_path)[1]), stat_result=stat_result)
+
+
+def main():
+    manifest = build()
+    for name, path in manifest['assets'].items():
+        print(f"{name} -> static/{path}")
+
+
+if __name__ == "__main__":
+    main()
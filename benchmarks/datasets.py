@@ -0,0 +1,171 @@
+"""Deterministic synthetic datasets for the benchmark harness.
+
+A dataset is a fully migrated horizon.db-style file holding `jobs`
+postings plus companies, practice problems and prep pages scaled to
+match. The same size and seed always produce the same rows, so results
+from different commits are comparable. Generate one directly with:
+
+    python benchmarks/datasets.py 100k --out /tmp/bench-100k.db
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import (create_jobs_fts_triggers, drop_jobs_fts_triggers, init_db,  # noqa: E402
+                      parse_salary, split_skills)
+
+# Bump when the generated rows change, so cached datasets are rebuilt
+DATASET_VERSION = 1
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+ROLES = ["Software Engineer", "Backend Developer", "Frontend Developer", "Data Scientist", "ML Engineer",
+         "DevOps Engineer", "Product Manager", "QA Engineer", "Security Analyst", "Cloud Architect",
+         "Mobile Developer", "Data Engineer", "UX Designer", "Site Reliability Engineer"]
+LEVELS = ["Junior", "Associate", "", "Senior", "Staff", "Lead"]
+CITIES = ["Bangalore, India", "Hyderabad, India", "Pune, India", "Mumbai, India", "Delhi, India",
+          "Chennai, India", "Gurgaon, India", "Noida, India", "Remote", "Kolkata, India"]
+TYPES = ["Full-time", "Full-time", "Full-time", "Contract", "Internship", "Part-time"]
+SKILLS = ["Python", "Java", "Go", "Rust", "C++", "JavaScript", "TypeScript", "React", "Next.js", "Node.js",
+          "SQL", "PostgreSQL", "MongoDB", "Redis", "Kafka", "AWS", "Azure", "GCP", "Docker", "Kubernetes",
+          "Terraform", "PyTorch", "TensorFlow", "Spark", "Figma", "System Design", "Microservices", "CSS"]
+TOPICS = ["Arrays", "Strings", "Linked Lists", "Stacks", "Queues", "Trees", "Graphs", "Heaps",
+          "Dynamic Programming", "Greedy", "Backtracking", "Binary Search", "Sorting", "Bit Manipulation"]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+CATEGORIES = ["Aptitude", "Coding", "Interview"]
+WORDS = ("scalable reliable distributed platform customers data services team build ship design "
+         "performance latency pipelines analytics secure cloud mobile growth mentor review").split()
+
+
+def parse_size(text):
+    text = text.lower()
+    if text in SIZES:
+        return SIZES[text]
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def scaled_counts(jobs):
+    # Everything else grows with the job count, within sane bounds
+    return {
+        'jobs': jobs,
+        'companies': max(20, jobs // 200),
+        'practice': max(50, min(jobs // 20, 20_000)),
+        'prep': max(10, min(jobs // 1000, 1_000)),
+    }
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _relative(seconds):
+    if seconds < 86400:
+        return f"{max(1, seconds // 3600)} hours ago"
+    if seconds < 7 * 86400:
+        return f"{seconds // 86400} days ago"
+    return f"{seconds // (7 * 86400)} weeks ago"
+
+
+def _job_rows(rng, count, companies, first_id, now):
+    for i in range(count):
+        low = rng.randrange(3, 60)
+        if rng.random() < 0.8:
+            salary = f"₹{low}L - ₹{low + rng.randrange(2, 30)}L"
+        else:
+            salary = f"${low * 5}k - ${low * 5 + rng.randrange(10, 80)}k"
+        age = rng.randrange(0, 90 * 86400)
+        level = rng.choice(LEVELS)
+        title = f"{level} {rng.choice(ROLES)}".strip() + f" R{first_id + i}"
+        requirements = ", ".join(rng.sample(SKILLS, rng.randrange(2, 6)))
+        yield (first_id + i, title, f"Company {rng.randrange(companies)}", rng.choice(CITIES), salary,
+               *parse_salary(salary), rng.choice(TYPES), _relative(age), now - age,
+               _sentence(rng, 24), requirements)
+
+
+def generate(path, jobs, seed=0):
+    """Create (or replace) a synthetic database at `path` with `jobs` postings."""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    rng = random.Random(seed)
+    counts = scaled_counts(jobs)
+    now = int(time.time())
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    init_db(conn)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.execute("BEGIN")
+    drop_jobs_fts_triggers(conn.cursor())
+
+    first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM jobs").fetchone()[0]
+    remaining = counts['jobs']
+    rows = _job_rows(rng, remaining, counts['companies'], first_id, now)
+    while remaining:
+        batch = [next(rows) for _ in range(min(remaining, 50_000))]
+        remaining -= len(batch)
+        conn.executemany('''
+        INSERT INTO jobs (id, title, company, location, salary, salary_min, salary_max, salary_currency,
+                          type, posted_date, posted_at, description, requirements)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        conn.executemany("INSERT INTO job_skills (job_id, skill, position) VALUES (?, ?, ?)",
+                         [(row[0], skill, position) for row in batch
+                          for position, skill in enumerate(split_skills(row[-1]))])
+    conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+    create_jobs_fts_triggers(conn.cursor())
+
+    conn.executemany('''
+    INSERT INTO companies (name, description, logo_url, hiring_process, syllabus, exam_pattern, eligibility)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(f"Company {i}", _sentence(rng, 12), "", "Online Test -> Technical -> HR",
+           "Aptitude, Coding, CS Fundamentals", "60 questions, 90 minutes", "60% throughout")
+          for i in range(counts['companies'])])
+    conn.executemany("INSERT INTO practice_problems (topic, problem_name, link, difficulty) VALUES (?, ?, ?, ?)",
+                     [(rng.choice(TOPICS), f"Problem {i}: {_sentence(rng, 3)}", f"https://example.com/p/{i}",
+                       rng.choice(DIFFICULTIES)) for i in range(counts['practice'])])
+    conn.executemany('''
+    INSERT INTO prep_materials (category, title, description, roadmap, notes, questions)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(rng.choice(CATEGORIES), f"Prep Guide {i}", _sentence(rng, 10),
+           json.dumps([_sentence(rng, 4) for _ in range(rng.randrange(4, 9))]), _sentence(rng, 60),
+           json.dumps([{'q': _sentence(rng, 10), 'a': _sentence(rng, 6)} for _ in range(rng.randrange(2, 6))]))
+          for i in range(counts['prep'])])
+    conn.commit()
+    conn.execute("PRAGMA optimize")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return counts
+
+
+def ensure(data_dir, size_name, seed=0):
+    """Path to the cached dataset for `size_name`, generating it if missing."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench-{size_name}-s{seed}-v{DATASET_VERSION}.db")
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        generate(tmp_path, parse_size(size_name), seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("size", help="job count: 1k, 100k, 1m or a number")
+    parser.add_argument("--out", required=True, help="database file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    counts = generate(args.out, parse_size(args.size), args.seed)
+    print(f"{args.out}: {counts} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""Reproducible benchmark suite: API routes, static build and cold start.
+
+For each dataset size (see datasets.py) every suite runs in a fresh
+subprocess, so imports, caches and peak-memory figures never leak
+between measurements:
+
+  api      in-process ASGI throughput and latency for each route, driven
+           through httpx.ASGITransport (no sockets, no uvicorn). Each
+           request fills the route's placeholders with different values
+           from the dataset. It runs once with the response caches and
+           once without; only the uncached run is gated
+  build    wall time and peak RSS of a full `build_static.build(force=True)`
+  startup  interpreter + `import app` + first request, median of --repeat,
+           then once more with the repo and database read-only (Linux)
+
+--storage postgres runs the same suites against PostgreSQL (see
+repository.py): each dataset is copied into --database-url first, so
+both backends are measured on identical rows.
+
+Results are written as JSON. Pass --baseline with an earlier results
+file to flag regressions beyond --threshold; the exit status is 1 when
+any metric regressed. Run from the repo root:
+
+    python benchmarks/harness.py --sizes 1k 100k --output bench-new.json --baseline bench-old.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+SUITES = ("api", "build", "startup")
+DEFAULT_DATA_DIR = os.path.join(BENCH_DIR, "data")
+# {name} placeholders are filled per request from values sampled out of the
+# dataset (see _route_values), so consecutive requests run different queries
+ROUTES = [
+    "/",
+    "/api/jobs",
+    "/api/jobs?cursor={cursor}",
+    "/api/jobs?q={term}",
+    "/api/jobs?skill={skill}&currency=INR&min_salary=3000000",
+    "/api/jobs?company={company}",
+    "/api/jobs?limit=100&cursor={cursor}",
+    "/api/jobs?limit=100&fields=id,title,company,salary&format=columnar&cursor={cursor}",
+    "/api/search?q={term}",
+    "/api/prep",
+    "/api/companies",
+    "/companies",
+    "/practice",
+    "/api/practice/topics",
+    "/api/practice?topic={topic}",
+    "/prep/{prep_id}",
+]
+# Distinct values sampled per placeholder
+SAMPLES = 200
+# api runs twice: with the response caches, and with them off
+# (LMT_PAGE_CACHE_SIZE=0) so every request pays for its queries and render
+API_MODES = {"cached": {}, "uncached": {"LMT_PAGE_CACHE_SIZE": "0"}}
+
+# Metric name -> True when a larger value is better
+HIGHER_IS_BETTER = {"rps": True}
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux; include forked build workers
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# --- suites, each run inside its own subprocess ------------------------------
+
+def _route_values(db_path, samples=SAMPLES):
+    """Placeholder values for ROUTES, drawn reproducibly from the dataset."""
+    from queries import encode_cursor
+
+    rng = random.Random(0)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        max_id = conn.execute("SELECT MAX(id) FROM jobs").fetchone()[0] or 0
+        ids = [rng.randint(1, max_id) for _ in range(samples)] if max_id else []
+        placeholders = ", ".join("?" for _ in ids)
+        jobs = conn.execute(f"SELECT id, posted_at, title, company FROM jobs WHERE id IN ({placeholders})",
+                            ids).fetchall()
+        skills = conn.execute(f"SELECT DISTINCT skill FROM job_skills WHERE job_id IN ({placeholders})",
+                              ids).fetchall()
+        return {
+            "cursor": [encode_cursor(posted_at, job_id) for job_id, posted_at, _, _ in jobs],
+            "term": sorted({word.lower() for _, _, title, _ in jobs for word in title.split()[:2]}),
+            "company": sorted({company for _, _, _, company in jobs}),
+            "skill": sorted(skill for (skill,) in skills),
+            "topic": [topic for (topic,) in conn.execute("SELECT DISTINCT topic FROM practice_problems")],
+            "prep_id": [prep_id for (prep_id,) in conn.execute("SELECT id FROM prep_materials")],
+        }
+    finally:
+        conn.close()
+
+
+def _expand(route, values, count=SAMPLES):
+    """Up to `count` concrete URLs for a ROUTES entry, in a fixed order."""
+    names = [name for _, name, _, _ in string.Formatter().parse(route) if name]
+    if not names:
+        return [route]
+    rng = random.Random(route)
+    return [route.format(**{name: urllib.parse.quote(str(rng.choice(values[name])), safe="")
+                            for name in names})
+            for _ in range(count) if all(values.get(name) for name in names)]
+
+
+async def _drive_route(client, paths, duration, concurrency):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    # Workers share one cycle, so requests walk through every variant
+    next_path = itertools.cycle(paths).__next__
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get(next_path())
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def _api_suite(duration, concurrency):
+    import httpx
+    import app
+
+    values = _route_values(os.environ["LMT_DB_PATH"])
+    results = {}
+    transport = httpx.ASGITransport(app=app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for route in ROUTES:
+            paths = _expand(route, values)
+            if not paths:
+                results[route] = {"error": "no values in this dataset"}
+                continue
+            # The first request pays for connections, templates and cache fill
+            started = time.perf_counter()
+            response = await client.get(paths[0])
+            cold_ms = round((time.perf_counter() - started) * 1000, 3)
+            if response.status_code != 200:
+                results[route] = {"error": f"HTTP {response.status_code}"}
+                continue
+            results[route] = {"cold_ms": cold_ms, "bytes": len(response.content), "variants": len(paths),
+                              **await _drive_route(client, paths, duration, concurrency)}
+    await app.repo.close()
+    return results
+
+
+def run_api(args):
+    return asyncio.run(_api_suite(args.duration, args.concurrency))
+
+
+def run_build(args):
+    import build_static
+
+    started = time.perf_counter()
+    report = build_static.build(force=True, workers=args.workers)
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "pages": report["pages_total"],
+        "data_files": report["data_written"],
+        "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in report["timings"].items()},
+    }
+
+
+def run_startup(args):
+    started = time.perf_counter()
+    import app  # noqa: F401  (timed: module import runs the database check)
+    imported = time.perf_counter()
+
+    import httpx
+
+    async def first_request():
+        transport = httpx.ASGITransport(app=app.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return (await client.get("/api/jobs")).status_code
+
+    status = asyncio.run(first_request())
+    done = time.perf_counter()
+    return {
+        "import_ms": round((imported - started) * 1000, 2),
+        "first_request_ms": round((done - imported) * 1000, 2),
+        "status": status,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+WORKERS = {"api": run_api, "build": run_build, "startup": run_startup}
+
+
+# --- orchestration -----------------------------------------------------------
+
+# Bind-mounts each directory argument read-only, then runs the command
+_READ_ONLY_SCRIPT = '''
+while [ "$1" != "--" ]; do
+    mount --bind "$1" "$1" && mount -o remount,ro,bind "$1" "$1" || exit 97
+    shift
+done
+shift
+exec "$@"
+'''
+
+
+def _read_only_prefix(directories):
+    """Command prefix that runs a process with `directories` read-only.
+
+    Uses a private mount namespace (util-linux unshare), like a serverless
+    bundle where nothing next to the code can be written. None when the
+    platform cannot do that.
+    """
+    if sys.platform != "linux" or shutil.which("unshare") is None:
+        return None
+    prefix = ["unshare", "--mount", "--map-root-user", "sh", "-c", _READ_ONLY_SCRIPT, "sh", *directories, "--"]
+    if subprocess.run(prefix + ["true"], capture_output=True).returncode != 0:
+        return None
+    return prefix
+
+
+def _spawn(suite, db_path, args, extra_env=None, prefix=()):
+    env = dict(os.environ, LMT_DB_PATH=db_path, LMT_STORAGE=args.storage, **(extra_env or {}))
+    if args.database_url:
+        env["LMT_DATABASE_URL"] = args.database_url
+    command = [*prefix, sys.executable, os.path.abspath(__file__), "--worker", suite,
+               "--duration", str(args.duration), "--concurrency", str(args.concurrency)]
+    if args.workers:
+        command += ["--workers", str(args.workers)]
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"{suite} worker failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), wall
+
+
+def run_size(size_name, args):
+    import datasets
+
+    started = time.perf_counter()
+    db_path = datasets.ensure(args.data_dir, size_name)
+    print(f"[{size_name}] dataset ready in {time.perf_counter() - started:.1f}s: {db_path}", file=sys.stderr)
+    result = {"counts": datasets.scaled_counts(datasets.parse_size(size_name))}
+    if args.storage == "postgres":
+        started = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(REPO_DIR, "repository.py"), "load-sqlite", db_path,
+                        "--database-url", args.database_url], cwd=REPO_DIR, check=True, stdout=subprocess.DEVNULL)
+        print(f"[{size_name}] loaded into PostgreSQL in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    for suite in args.suites:
+        print(f"[{size_name}] {suite} ...", file=sys.stderr)
+        if suite == "build" and args.storage != "sqlite":
+            # build_static exports straight from the SQLite file (FTS5 vocab)
+            print(f"[{size_name}] build skipped: it always reads SQLite", file=sys.stderr)
+        elif suite == "build":
+            with tempfile.TemporaryDirectory() as docs_dir:
+                result["build"], _ = _spawn("build", db_path, args, {"LMT_DOCS_DIR": docs_dir})
+        elif suite == "startup":
+            runs = [_spawn("startup", db_path, args) for _ in range(args.repeat)]
+            result["startup"] = {
+                metric: statistics.median(run[metric] for run, _ in runs)
+                for metric in ("import_ms", "first_request_ms", "peak_rss_mb")
+            }
+            result["startup"]["process_ms"] = round(statistics.median(wall for _, wall in runs) * 1000, 2)
+            if args.storage == "sqlite":
+                result["startup"]["read_only"] = _read_only_start(db_path, args, size_name)
+        elif suite == "api":
+            result["api"] = {mode: _spawn("api", db_path, args, env)[0] for mode, env in API_MODES.items()}
+        else:
+            result[suite], _ = _spawn(suite, db_path, args)
+    return result
+
+
+def _read_only_start(db_path, args, size_name):
+    """Cold start with the code and the database on a read-only filesystem.
+
+    Fails the run when the app cannot start there (e.g. it needs to write
+    the database's -shm file or static/dist/).
+    """
+    prefix = _read_only_prefix(sorted({REPO_DIR, os.path.dirname(os.path.abspath(db_path))}))
+    if prefix is None:
+        print(f"[{size_name}] read-only start skipped: needs Linux with unshare", file=sys.stderr)
+        return {}
+    # A deployed file comes without -wal/-shm; the last connection to close removes them
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    run, wall = _spawn("startup", db_path, args, prefix=prefix)
+    if run["status"] != 200:
+        raise RuntimeError(f"read-only start answered the first request with {run['status']}")
+    return {"import_ms": run["import_ms"], "first_request_ms": run["first_request_ms"],
+            "process_ms": round(wall * 1000, 2)}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(tree, prefix=""):
+    for key, value in tree.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name + " :: ")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, key, value
+
+
+# cold_ms is a single request, too noisy to gate on; it is still recorded
+TRACKED = {"rps", "p50_ms", "p95_ms", "p99_ms", "seconds", "peak_rss_mb",
+           "import_ms", "first_request_ms", "process_ms"}
+# Cached API figures measure the cache, not the code behind it: recorded,
+# never gated. Regressions are judged on the uncached run.
+UNGATED = (" :: api :: cached :: ",)
+
+
+def _gated(name, key):
+    return key in TRACKED and not any(section in name for section in UNGATED)
+
+
+def compare(baseline, current, threshold):
+    """Return (name, old, new, change) for every gated metric worse than threshold."""
+    old = {name: value for name, key, value in _flatten(baseline.get("results", {})) if _gated(name, key)}
+    regressions = []
+    for name, key, new in _flatten(current.get("results", {})):
+        if not _gated(name, key) or name not in old or not old[name]:
+            continue
+        change = (new - old[name]) / old[name]
+        worse = -change if HIGHER_IS_BETTER.get(key) else change
+        if worse > threshold:
+            regressions.append((name, old[name], new, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], help="1k, 100k, 1m or a job count")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds of load per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent in-process clients")
+    parser.add_argument("--workers", type=int, default=None, help="static build processes")
+    parser.add_argument("--repeat", type=int, default=5, help="cold starts to take the median of")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated datasets are cached")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="relative change flagged as a regression")
+    parser.add_argument("--storage", choices=("sqlite", "postgres"), default="sqlite",
+                        help="backend the app runs on; datasets are copied into PostgreSQL first")
+    parser.add_argument("--database-url", default=os.environ.get("LMT_DATABASE_URL"),
+                        help="PostgreSQL DSN for --storage postgres (default: LMT_DATABASE_URL)")
+    parser.add_argument("--worker", choices=SUITES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.storage == "postgres" and not args.database_url:
+        parser.error("--storage postgres needs --database-url or LMT_DATABASE_URL")
+
+    if args.worker:
+        print(json.dumps(WORKERS[args.worker](args)))
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    results = {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "storage": args.storage,
+        },
+        "results": {size: run_size(size, args) for size in args.sizes},
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"results written to {args.output}")
+
+    for size, result in results["results"].items():
+        for mode, routes in result.get("api", {}).items():
+            for path, route in routes.items():
+                if "rps" in route:
+                    print(f"  {size:>5} {mode:<8} {path:<84} {route['rps']:>9.1f} rps  "
+                          f"p50 {route['p50_ms']:.2f} ms  p99 {route['p99_ms']:.2f} ms  cold {route['cold_ms']:.1f} ms")
+        if "build" in result:
+            print(f"  {size:>5} static build {result['build']['seconds']:.2f}s, "
+                  f"peak {result['build']['peak_rss_mb']} MB, {result['build']['pages']} pages")
+        if "startup" in result:
+            print(f"  {size:>5} cold start {result['startup']['process_ms']:.0f} ms "
+                  f"(import {result['startup']['import_ms']:.0f} ms, "
+                  f"first request {result['startup']['first_request_ms']:.1f} ms)")
+            if result["startup"].get("read_only"):
+                print(f"  {size:>5} read-only cold start {result['startup']['read_only']['process_ms']:.0f} ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        print(f"compared with {args.baseline} (revision {baseline.get('meta', {}).get('revision')}): "
+              f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        for name, old, new, change in regressions:
+            print(f"  REGRESSION {name}: {old} -> {new} ({change:+.1%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
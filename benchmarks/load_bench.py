@@ -0,0 +1,86 @@
+"""Closed-loop HTTP load benchmark for a running server.
+
+Start the app first (e.g. `uvicorn app:app --workers 4`), then run:
+
+    python benchmarks/load_bench.py --url http://127.0.0.1:8000
+
+Each client keeps one keep-alive connection and issues requests back to
+back for --duration seconds. Prints requests/sec and latency percentiles
+per path and concurrency level.
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+
+PATHS = ["/api/jobs", "/prep/1"]
+CONCURRENCY = [1, 8, 64]
+
+
+def _client(host, port, path, deadline, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(repr(exc))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run(url, path, clients, duration):
+    parsed = urlparse(url)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_client, args=(parsed.hostname, parsed.port or 80, path, deadline, latencies, errors))
+        for _ in range(clients)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    if not latencies:
+        return {"rps": 0.0, "p50_ms": None, "p99_ms": None, "errors": len(errors)}
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per measurement")
+    parser.add_argument("--paths", nargs="+", default=PATHS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=CONCURRENCY)
+    args = parser.parse_args()
+
+    print(f"{'path':<16}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for path in args.paths:
+        for clients in args.concurrency:
+            r = run(args.url, path, clients, args.duration)
+            p50 = f"{r['p50_ms']:.1f}" if r["p50_ms"] is not None else "-"
+            p99 = f"{r['p99_ms']:.1f}" if r["p99_ms"] is not None else "-"
+            print(f"{path:<16}{clients:>8}{r['rps']:>10.0f}{p50:>10}{p99:>10}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
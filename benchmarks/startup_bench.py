@@ -0,0 +1,79 @@
+"""Cold-start cost of bringing the database up, against seed size.
+
+Compares the old boot path (fresh :memory: database, schema + every seed
+row inserted on each start) with the persistent path (open an existing
+horizon.db-style file and run the version check). Run from the repo root:
+
+    python benchmarks/startup_bench.py --sizes 10 10000 100000
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db, needs_init  # noqa: E402
+from datastore import Database  # noqa: E402
+
+
+def synthetic_jobs(count):
+    for i in range(count):
+        yield (f"Engineer {i}", f"Company {i % 500}", f"City {i % 40}", "₹10L - ₹20L",
+               "Full-time", "1 day ago", 0, "Synthetic posting.", "Python, SQL")
+
+
+def insert_jobs(conn, count):
+    conn.executemany('''
+    INSERT INTO jobs (title, company, location, salary, type, posted_date, posted_at, description, requirements)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', synthetic_jobs(count))
+    conn.commit()
+
+
+def legacy_boot(count):
+    start = time.perf_counter()
+    conn = sqlite3.connect(":memory:")
+    init_db(conn)
+    insert_jobs(conn, count)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def persistent_boot(path):
+    start = time.perf_counter()
+    db = Database(path)
+    db.initialize(init_db, needs_init)
+    with db.reader() as conn:
+        conn.execute("SELECT id FROM jobs ORDER BY posted_at DESC, id DESC LIMIT 1").fetchone()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'seed rows':>10}{'legacy ms':>12}{'persistent ms':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"bench_{size}.db")
+            conn = sqlite3.connect(path)
+            init_db(conn)
+            insert_jobs(conn, size)
+            conn.close()
+
+            legacy = statistics.median(legacy_boot(size) for _ in range(args.repeat))
+            persistent = statistics.median(persistent_boot(path) for _ in range(args.repeat))
+            print(f"{size:>10}{legacy * 1000:>12.1f}{persistent * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
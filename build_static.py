@@ -1,38 +1,30 @@
 import os
 import json
-import shutil
+import time
+import hashlib
 import sqlite3
-from jinja2 import Environment, FileSystemLoader
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from jinja2 import Environment, FileSystemLoader, meta
+
+import assets
+import static_export
+from queries import PRACTICE_PAGE_SIZE, practice_topics
+from read_model import load_prep
 
 # Setup directories
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DOCS_DIR = os.path.join(BASE_DIR, 'docs')
-if os.path.exists(DOCS_DIR):
-    shutil.rmtree(DOCS_DIR)
-os.makedirs(DOCS_DIR)
-
-# 1. Flatten Static Assets
-# Copy style.css
-src_css = os.path.join(BASE_DIR, 'static', 'css', 'style.css')
-dst_css = os.path.join(DOCS_DIR, 'style.css')
-if os.path.exists(src_css):
-    shutil.copy(src_css, dst_css)
-
-# Copy main.js (we will modify it later, but copy first as base)
-src_js = os.path.join(BASE_DIR, 'static', 'js', 'main.js')
-dst_js = os.path.join(DOCS_DIR, 'main.js')
-if os.path.exists(src_js):
-    with open(src_js, 'r') as f:
-        js_content = f.read()
-
-# Initialize DB connection (In-Memory for seed data)
-conn = sqlite3.connect(":memory:")
-conn.row_factory = sqlite3.Row
-from database import init_db
-init_db(conn)
-
-# Setup Jinja2
-env = Environment(loader=FileSystemLoader('templates'))
+DOCS_DIR = os.environ.get('LMT_DOCS_DIR', os.path.join(BASE_DIR, 'docs'))
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+MANIFEST_PATH = os.path.join(DOCS_DIR, '.build-manifest.json')
+
+# Monolithic data files replaced by the sharded export in docs/data/, and
+# the unhashed assets replaced by the fingerprinted ones
+RETIRED_OUTPUTS = ('jobs.json', 'prep.json', 'style.css', 'main.js')
+
+# Below this many changed pages a process pool costs more than it saves
+PARALLEL_THRESHOLD = 16
 
 # Helper to fix paths in HTML
 def flatten_paths(html_content):
@@ -40,85 +32,220 @@ def flatten_paths(html_content):
     html_content = html_content.replace('href="/static/css/style.css"', 'href="style.css"')
     html_content = html_content.replace('href="static/css/style.css"', 'href="style.css"')
     html_content = html_content.replace('/static/css/style.css', 'style.css')
-    
+
     # JS
     html_content = html_content.replace('src="/static/js/main.js"', 'src="main.js"')
     html_content = html_content.replace('src="static/js/main.js"', 'src="main.js"')
     html_content = html_content.replace('/static/js/main.js', 'main.js')
-    
+
     # Nav Links
     html_content = html_content.replace('href="/companies"', 'href="companies.html"')
     html_content = html_content.replace('href="/practice"', 'href="practice.html"')
     html_content = html_content.replace('href="/"', 'href="index.html"')
-    
+
     return html_content
 
-# 2. Render HTML Pages
-# Index
-template = env.get_template('index.html')
-with open(os.path.join(DOCS_DIR, 'index.html'), 'w') as f:
-    f.write(flatten_paths(template.render()))
-
-# Companies
-companies = conn.execute('SELECT * FROM companies').fetchall()
-data_companies = [dict(c) for c in companies]
-template = env.get_template('companies.html')
-with open(os.path.join(DOCS_DIR, 'companies.html'), 'w') as f:
-    f.write(flatten_paths(template.render(companies=data_companies)))
-
-# Practice
-problems = conn.execute('SELECT * FROM practice_problems').fetchall()
-grouped = {}
-for p in problems:
-    p_dict = dict(p)
-    topic = p_dict['topic']
-    if topic not in grouped:
-        grouped[topic] = []
-    grouped[topic].append(p_dict)
-template = env.get_template('practice.html')
-with open(os.path.join(DOCS_DIR, 'practice.html'), 'w') as f:
-    f.write(flatten_paths(template.render(grouped_problems=grouped)))
-
-# Prep Details
-preps = conn.execute('SELECT * FROM prep_materials').fetchall()
-data_prep = [dict(p) for p in preps]
-for p in data_prep:
-    p['roadmap'] = json.loads(p['roadmap'])
-    p['questions'] = json.loads(p['questions'])
-    template = env.get_template('prep_detail.html')
-    with open(os.path.join(DOCS_DIR, f"prep_{p['id']}.html"), 'w') as f:
-        f.write(flatten_paths(template.render(prep=p)))
-
-# 3. Create JSON Data Files (Flat)
-conn_jobs = conn.execute('SELECT * FROM jobs').fetchall()
-data_jobs = [dict(j) for j in conn_jobs]
-
-with open(os.path.join(DOCS_DIR, 'jobs.json'), 'w') as f:
-    json.dump(data_jobs, f)
-
-with open(os.path.join(DOCS_DIR, 'prep.json'), 'w') as f:
-    # We re-fetch prep to get raw JSON strings if needed, or use cleaned data_prep
-    # data_prep has parsed JSON, we might want consistent JSON for JS
-    # Let's just dump data_prep but ensure keys match what JS expects
-    json.dump(data_prep, f) 
-
-# 4. Fix main.js to use flat paths
-# Replace API endpoints with flat JSON files
-js_content = js_content.replace('/api/jobs', 'jobs.json')
-js_content = js_content.replace('api/jobs.json', 'jobs.json') # in case repeated
-js_content = js_content.replace('/api/prep', 'prep.json')
-js_content = js_content.replace('api/prep.json', 'prep.json')
-
-# Replace dynamic links with flat HTML links
-js_content = js_content.replace('`/prep/${item.id}`', '`prep_${item.id}.html`')
-js_content = js_content.replace("window.location.href = `/prep/${item.id}`", "window.location.href = `prep_${item.id}.html`")
-js_content = js_content.replace('href="/companies"', 'href="companies.html"')
-js_content = js_content.replace('href="/practice"', 'href="practice.html"')
-
-# Start Learning button in JS often has /prep/id
-js_content = js_content.replace('href="/prep/${item.id}"', 'href="prep_${item.id}.html"')
-
-with open(dst_js, 'w') as f:
-    f.write(js_content)
-
-print(f"Flat static site built in {DOCS_DIR}")
+
+def flatten_js(js_content):
+    # The flat site has no API: switch main.js over to the sharded JSON export
+    js_content = js_content.replace('const STATIC_SITE = false;', 'const STATIC_SITE = true;')
+
+    # Replace dynamic links with flat HTML links
+    js_content = js_content.replace('`/prep/${item.id}`', '`prep_${item.id}.html`')
+    js_content = js_content.replace("window.location.href = `/prep/${item.id}`", "window.location.href = `prep_${item.id}.html`")
+    js_content = js_content.replace('href="/companies"', 'href="companies.html"')
+    js_content = js_content.replace('href="/practice"', 'href="practice.html"')
+
+    # Start Learning button in JS often has /prep/id
+    js_content = js_content.replace('href="/prep/${item.id}"', 'href="prep_${item.id}.html"')
+    return js_content
+
+
+def sha256(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def template_fingerprints(env):
+    """Hash of every template together with everything it extends/includes."""
+    sources = {name: env.loader.get_source(env, name)[0] for name in env.list_templates()}
+    deps = {}
+    for name, source in sources.items():
+        deps[name] = {ref for ref in meta.find_referenced_templates(env.parse(source)) if ref}
+
+    def closure(name, seen):
+        if name not in seen:
+            seen.add(name)
+            for ref in deps.get(name, ()):
+                closure(ref, seen)
+        return seen
+
+    return {
+        name: sha256(''.join(sources[dep] for dep in sorted(closure(name, set())) if dep in sources))
+        for name in sources
+    }
+
+
+def page_specs(conn):
+    """Every HTML page of the site as (output file, template, context)."""
+    yield 'index.html', 'index.html', {}
+
+    companies = [dict(c) for c in conn.execute('SELECT * FROM companies')]
+    yield 'companies.html', 'companies.html', {'companies': companies}
+
+    yield 'practice.html', 'practice.html', {'topics': practice_topics(conn), 'page_size': PRACTICE_PAGE_SIZE}
+
+    _, details = load_prep(conn)
+    for prep_id, prep in details.items():
+        yield f"prep_{prep_id}.html", 'prep_detail.html', {'prep': prep}
+
+
+_worker_env = None
+
+
+def flatten_asset(name, text):
+    return flatten_js(text) if name.endswith('.js') else text
+
+
+def render_page(job):
+    """Render one page and write it to docs/. Runs in pool workers too."""
+    global _worker_env
+    output, template_name, context, asset_names = job
+    if _worker_env is None:
+        _worker_env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+    # Flat site: fingerprinted assets sit next to the pages
+    _worker_env.globals['asset_url'] = assets.url_for(asset_names, prefix='')
+    html = flatten_paths(_worker_env.get_template(template_name).render(**context))
+    assets.write_atomic(os.path.join(DOCS_DIR, output), html)
+    return output
+
+
+def build(force=False, workers=None):
+    timings = {}
+    started = time.perf_counter()
+    os.makedirs(DOCS_DIR, exist_ok=True)
+    old_manifest = {} if force else load_manifest()
+    manifest = {}
+
+    # Open the persistent database (migrated/seeded only if out of date)
+    from datastore import DB_PATH
+    from database import init_db
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    init_db(conn)
+
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+    with open(os.path.abspath(__file__), 'rb') as f:
+        builder_hash = sha256(f.read())
+    template_hashes = template_fingerprints(env)
+
+    # 1. Static assets: main.js retargeted at the flat site, then minified
+    # and fingerprinted by the asset pipeline
+    t = time.perf_counter()
+    asset_names = {}
+    assets_written = 0
+    for name, hashed, content in assets.compile_assets(STATIC_DIR, transform=flatten_asset):
+        output = os.path.basename(hashed)
+        asset_names[name] = output
+        manifest[output] = sha256(content)
+        if old_manifest.get(output) != manifest[output] or not os.path.exists(os.path.join(DOCS_DIR, output)):
+            assets.write_atomic(os.path.join(DOCS_DIR, output), content)
+            assets_written += 1
+    # Pages embed the asset names, so they change exactly when an asset does
+    assets_hash = sha256(json.dumps(asset_names, sort_keys=True))
+    timings['assets'] = time.perf_counter() - t
+
+    # Pages and data are read from one snapshot, so an ingest committing
+    # mid-build cannot make them describe different rows
+    with static_export.read_snapshot(conn):
+        # 2. HTML pages: hash row data + template closure + assets + builder,
+        # re-render only the pages whose hash moved
+        t = time.perf_counter()
+        changed = []
+        total_pages = 0
+        for output, template_name, context in page_specs(conn):
+            total_pages += 1
+            digest = sha256(json.dumps(context, sort_keys=True, default=str)
+                            + template_hashes[template_name] + assets_hash + builder_hash)
+            manifest[output] = digest
+            if old_manifest.get(output) != digest or not os.path.exists(os.path.join(DOCS_DIR, output)):
+                changed.append((output, template_name, context, asset_names))
+        timings['diff'] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        if len(changed) >= PARALLEL_THRESHOLD and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for _ in pool.map(render_page, changed, chunksize=8):
+                    pass
+        else:
+            for job in changed:
+                render_page(job)
+        timings['render'] = time.perf_counter() - t
+
+        # 3. Sharded JSON data, streamed straight from SQLite
+        t = time.perf_counter()
+        os.makedirs(os.path.join(DOCS_DIR, static_export.DATA_DIR), exist_ok=True)
+        data_written = 0
+
+        def write_data(output, content):
+            nonlocal data_written
+            digest = sha256(content)
+            manifest[output] = digest
+            if old_manifest.get(output) != digest or not os.path.exists(os.path.join(DOCS_DIR, output)):
+                assets.write_atomic(os.path.join(DOCS_DIR, output), content)
+                data_written += 1
+
+        static_export.export_all(conn, write_data)
+        timings['data'] = time.perf_counter() - t
+    conn.close()
+
+    # 4. Drop outputs that no longer have a source row (e.g. deleted prep)
+    removed = 0
+    for output in (set(old_manifest) | set(RETIRED_OUTPUTS)) - set(manifest):
+        path = os.path.join(DOCS_DIR, output)
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+
+    assets.write_atomic(MANIFEST_PATH, json.dumps(manifest, indent=1, sort_keys=True))
+    timings['total'] = time.perf_counter() - started
+
+    return {
+        'pages_total': total_pages,
+        'pages_rendered': len(changed),
+        'assets_written': assets_written,
+        'data_written': data_written,
+        'removed': removed,
+        'timings': timings,
+    }
+
+
+def print_report(report):
+    t = report['timings']
+    print(f"Flat static site built in {DOCS_DIR}")
+    print(f"  pages:  {report['pages_rendered']}/{report['pages_total']} re-rendered, "
+          f"{report['pages_total'] - report['pages_rendered']} unchanged")
+    print(f"  assets: {report['assets_written']} written, data files: {report['data_written']} written, "
+          f"stale outputs removed: {report['removed']}")
+    print("  time:   " + ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in t.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the flat static site into docs/")
+    parser.add_argument('--force', action='store_true', help="ignore the manifest and re-render everything")
+    parser.add_argument('--workers', type=int, default=None, help="render processes (default: CPU count)")
+    args = parser.parse_args()
+    print_report(build(force=args.force, workers=args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,68 @@
 import sqlite3
 import os
 import json
+import re
+import time
 
-def init_db(conn):
-    cursor = conn.cursor()
+_RELATIVE_DATE = re.compile(r'(\d+)\s+(minute|hour|day|week|month)s?\s+ago', re.IGNORECASE)
+_UNIT_SECONDS = {'minute': 60, 'hour': 3600, 'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400}
+
+def parse_posted_date(text, now=None):
+    # Turn display text like "2 days ago" / "Today" into a unix timestamp
+    now = int(now if now is not None else time.time())
+    text = (text or '').strip()
+    if text.lower() in ('today', 'just now'):
+        return now
+    if text.lower() == 'yesterday':
+        return now - _UNIT_SECONDS['day']
+    match = _RELATIVE_DATE.search(text)
+    if match:
+        return now - int(match.group(1)) * _UNIT_SECONDS[match.group(2).lower()]
+    return now
+
+_CURRENCY_SYMBOLS = {'₹': 'INR', '$': 'USD', '€': 'EUR', '£': 'GBP'}
+_CURRENCY_CODE = re.compile(r'\b(INR|USD|EUR|GBP)\b', re.IGNORECASE)
+_SALARY_AMOUNT = re.compile(r'(\d+(?:\.\d+)?)\s*(lakhs?|lpa|cr|k|l|m)?(?![a-z])', re.IGNORECASE)
+_SALARY_UNITS = {'k': 1_000, 'l': 100_000, 'lpa': 100_000, 'lakh': 100_000, 'lakhs': 100_000,
+                 'm': 1_000_000, 'cr': 10_000_000}
+# Largest value an INTEGER column (BIGINT on PostgreSQL) holds
+MAX_INTEGER = 2 ** 63 - 1
 
+def parse_salary(text):
+    # Turn display text like "₹20L - ₹40L" / "$150k - $220k" into
+    # (min, max, currency) in whole currency units; (None, None, None) if unparseable
+    text = (text or '').replace(',', '')
+    amounts = _SALARY_AMOUNT.findall(text)
+    if not amounts:
+        return None, None, None
+    # "₹20-40L": a unit on the last amount applies to the bare ones before it
+    default_unit = amounts[-1][1]
+    values = [float(number) * _SALARY_UNITS.get((unit or default_unit).lower(), 1) for number, unit in amounts[:2]]
+    # "999999999999999999999 cr" is noise, not a salary an INTEGER column can hold
+    if not all(value <= MAX_INTEGER for value in values):
+        return None, None, None
+    values = [round(value) for value in values]
+    currency = next((code for symbol, code in _CURRENCY_SYMBOLS.items() if symbol in text), None)
+    if currency is None:
+        code = _CURRENCY_CODE.search(text)
+        currency = code.group(1).upper() if code else None
+    return min(values), max(values), currency
+
+def split_skills(requirements):
+    # "Python, React, System Design" -> ['Python', 'React', 'System Design']
+    skills = []
+    seen = set()
+    for skill in (requirements or '').split(','):
+        skill = skill.strip()
+        if skill and skill.lower() not in seen:
+            seen.add(skill.lower())
+            skills.append(skill)
+    return skills
+
+# Schema migrations. Each step is idempotent and runs once per database,
+# tracked through PRAGMA user_version; append new steps, never edit old ones.
+
+def _create_base_tables(cursor):
     # Jobs Table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS jobs (
@@ -58,176 +116,548 @@ def init_db(conn):
     )
     ''')
 
-    # Seed Jobs
-    jobs = [
-        ("Software Engineer", "Google", "Bangalore, India", "₹20L - ₹40L", "Full-time", "2 days ago", "Work on cutting edge AI features.", "Python, React, System Design"),
-        ("Data Scientist", "Meta", "Remote", "$150k - $220k", "Full-time", "1 day ago", "Help us build the metaverse.", "ML, PyTorch, SQL"),
-        ("Product Manager", "Apple", "Mumbai, India", "₹15L - ₹30L", "Full-time", "5 hours ago", "Shape the future of consumer tech.", "Agile, Product Vision"),
-        ("Frontend Developer", "Netflix", "Hyderabad, India", "₹18L - ₹35L", "Contract", "3 days ago", "Build high performance UI for millions.", "Next.js, Tailwind, CSS"),
-        ("Backend Architect", "Amazon", "Pune, India", "₹25L - ₹50L", "Full-time", "1 week ago", "Architect scalable cloud services.", "Java, AWS, Microservices"),
-        ("UX Designer", "Airbnb", "Remote", "₹12L - ₹20L", "Full-time", "4 days ago", "Design beautiful travel experiences.", "Figma, User Research"),
-        ("Cloud Engineer", "Microsoft", "Delhi, India", "₹16L - ₹28L", "Full-time", "2 days ago", "Manage Azure infrastructure.", "Terraform, Kubernetes, Azure"),
-        ("ML Engineer", "NVIDIA", "Bangalore, India", "₹30L - ₹60L", "Full-time", "Today", "Optimizing deep learning kernels.", "C++, CUDA, DL"),
-        ("Junior Developer", "StartupX", "Remote", "₹6L - ₹10L", "Internship", "1 day ago", "Fast paced learning environment.", "HTML, CSS, JS"),
-        ("Security Analyst", "GlobalBank", "Gurgaon, India", "₹14L - ₹25L", "Full-time", "6 days ago", "Ensure banking security.", "Cybersecurity, PenTesting")
-    ]
 
+def _add_job_listing_indexes(cursor):
+    # posted_at gives listings a sortable timestamp; backfill it from the
+    # relative posted_date for rows created before this column existed
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(jobs)")]
+    if 'posted_at' not in columns:
+        cursor.execute("ALTER TABLE jobs ADD COLUMN posted_at INTEGER NOT NULL DEFAULT 0")
+    now = int(time.time())
+    stale = cursor.execute("SELECT id, posted_date FROM jobs WHERE posted_at = 0").fetchall()
+    cursor.executemany("UPDATE jobs SET posted_at = ? WHERE id = ?",
+                       [(parse_posted_date(posted_date, now), job_id) for job_id, posted_date in stale])
+
+    # Every filter column leads into the (posted_at, id) keyset order so
+    # /api/jobs pages never need a sort or an OFFSET scan
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_posted ON jobs (posted_at DESC, id DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company, posted_at DESC, id DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs (location, posted_at DESC, id DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_type ON jobs (type, posted_at DESC, id DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_salary ON jobs (salary, posted_at DESC, id DESC)')
+
+
+JOBS_FTS_TRIGGERS = ('jobs_fts_ai', 'jobs_fts_ad', 'jobs_fts_au')
+
+
+def create_jobs_fts_triggers(cursor):
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts (rowid, title, company, requirements)
+        VALUES (new.id, new.title, new.company, new.requirements);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, requirements)
+        VALUES ('delete', old.id, old.title, old.company, old.requirements);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, company, requirements ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, requirements)
+        VALUES ('delete', old.id, old.title, old.company, old.requirements);
+        INSERT INTO jobs_fts (rowid, title, company, requirements)
+        VALUES (new.id, new.title, new.company, new.requirements);
+    END
+    ''')
+
+
+def drop_jobs_fts_triggers(cursor):
+    # Bulk loads drop the per-row sync triggers and rebuild jobs_fts once
+    for name in JOBS_FTS_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def restore_jobs_fts(cursor):
+    # Reindex what was written while the triggers were gone, then bring them back
+    cursor.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+    create_jobs_fts_triggers(cursor)
+
+
+def jobs_fts_triggers_missing(conn):
+    """True once a bulk load that dropped the triggers died before restoring them."""
+    placeholders = ', '.join('?' for _ in JOBS_FTS_TRIGGERS)
+    present = conn.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+                           JOBS_FTS_TRIGGERS).fetchone()[0]
+    return present < len(JOBS_FTS_TRIGGERS)
+
+
+def _add_full_text_search(cursor):
+    # External-content FTS5 tables kept in sync by triggers
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, requirements,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    ''')
+    create_jobs_fts_triggers(cursor)
+
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS prep_fts USING fts5(
+        title, description, notes, questions,
+        content='prep_materials', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS prep_fts_ai AFTER INSERT ON prep_materials BEGIN
+        INSERT INTO prep_fts (rowid, title, description, notes, questions)
+        VALUES (new.id, new.title, new.description, new.notes, new.questions);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS prep_fts_ad AFTER DELETE ON prep_materials BEGIN
+        INSERT INTO prep_fts (prep_fts, rowid, title, description, notes, questions)
+        VALUES ('delete', old.id, old.title, old.description, old.notes, old.questions);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS prep_fts_au AFTER UPDATE ON prep_materials BEGIN
+        INSERT INTO prep_fts (prep_fts, rowid, title, description, notes, questions)
+        VALUES ('delete', old.id, old.title, old.description, old.notes, old.questions);
+        INSERT INTO prep_fts (rowid, title, description, notes, questions)
+        VALUES (new.id, new.title, new.description, new.notes, new.questions);
+    END
+    ''')
+
+    # Index whatever rows already exist
+    cursor.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO prep_fts (prep_fts) VALUES ('rebuild')")
+
+
+def _add_meta_table(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+    ''')
+
+
+def _add_job_natural_key(cursor):
+    # Feeds are de-duplicated on (company, title, location); collapse any
+    # existing duplicates onto the oldest row before enforcing it
+    cursor.execute('''
+    DELETE FROM jobs WHERE id NOT IN (
+        SELECT MIN(id) FROM jobs GROUP BY company, title, location
+    )
+    ''')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_natural_key ON jobs (company, title, location)')
+
+
+def replace_job_skills(cursor, rows):
+    # rows are (company, title, location, requirements), matched on the natural key;
+    # a key repeated within `rows` gets the skills of its last row, as the upsert does
+    rows = list({row[:3]: row for row in rows}.values())
+    cursor.executemany('''
+    DELETE FROM job_skills WHERE job_id = (SELECT id FROM jobs WHERE company = ? AND title = ? AND location = ?)
+    ''', [row[:3] for row in rows])
     cursor.executemany('''
-    INSERT INTO jobs (title, company, location, salary, type, posted_date, description, requirements)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', jobs)
-
-    # Seed Prep Materials
-    prep = [
-        (
-            "Aptitude", "Quantitative Mastery", 
-            "Comprehensive guide to mastering numerical ability for placements.",
-            json.dumps(["Number Systems & Simplification", "Percentages, Profit & Loss", "Averages, Ratio & Proportion", "Time, Speed & Distance", "Simple & Compound Interest", "Permutation, Combination & Probability"]),
-            "Quantitative aptitude is the cornerstone of technical placements. To succeed, focus on two things: Speed and Accuracy.",
-            json.dumps([{"q": "A can do a work in 15 days and B in 20 days. If they work together for 4 days, what fraction of work is left?", "a": "8/15."}])
-        ),
-        (
-            "Coding", "Dynamic Programming Essentials", 
-            "Learn the art of optimizing recursive solutions using DP.",
-            json.dumps(["Recursion Fundamentals", "Memoization Strategy", "Tabulation (Bottom-Up)"]),
-            "Dynamic Programming (DP) is often the most feared topic in coding interviews. However, it's just recursion with storage.",
-            json.dumps([{"q": "What is the core difference between Memoization and Tabulation?", "a": "Memoization is Top-Down, Tabulation is Bottom-Up."}])
-        ),
-        (
-            "Interview", "System Design for Beginners", 
-            "Master the high-level architecture of scalable applications.",
-            json.dumps(["Introduction to Scalability", "Load Balancers", "Caching"]),
-            "In System Design, there is no single 'correct' answer; it's all about tradeoffs.",
-            json.dumps([{"q": "What is the CAP Theorem?", "a": "Consistency, Availability, and Partition Tolerance."}])
-        ),
-        (
-            "Aptitude", "Logical Reasoning", 
-            "Sharpen your analytical skills with logical puzzles and patterns.",
-            json.dumps(["Syllogisms", "Blood Relations", "Seating Arrangements"]),
-            "Logical reasoning tests your ability to structured thinking.",
-            json.dumps([{"q": "All cats are dogs. No dogs are birds. Can we say some cats are birds?", "a": "No."}])
-        ),
-        (
-            "Coding", "SQL for Data Science", 
-            "Essential data manipulation skills using SQL.",
-            json.dumps(["Relational Database Basics", "Advanced JOIN Operations"]),
-            "SQL is the bread and butter of data roles.",
-            json.dumps([{"q": "How do you find the second highest salary?", "a": "Using subqueries or LIMIT/OFFSET."}])
-        ),
-        (
-            "Interview", "HR Rounds: Top 50 Questions", 
-            "Master soft skills and behavioral questions for the final round.",
-            json.dumps(["The 'Tell Me About Yourself' pitch", "STAR Method"]),
-            "HR rounds check if you are a culture fit.",
-            json.dumps([{"q": "Why should we hire you?", "a": "Align your skills with the company mission."}])
-        )
-    ]
+    INSERT OR IGNORE INTO job_skills (job_id, skill, position)
+    SELECT id, ?4, ?5 FROM jobs WHERE company = ?1 AND title = ?2 AND location = ?3
+    ''', [row[:3] + (skill, position)
+          for row in rows for position, skill in enumerate(split_skills(row[3]))])
+
+
+def backfill_job_fields(cursor):
+    # Derive salary_* and job_skills for rows that were written without them
+    stale = cursor.execute('''
+    SELECT id, salary FROM jobs WHERE salary_min IS NULL AND salary_currency IS NULL AND salary IS NOT NULL
+    ''').fetchall()
+    cursor.executemany("UPDATE jobs SET salary_min = ?, salary_max = ?, salary_currency = ? WHERE id = ?",
+                       [parse_salary(salary) + (job_id,) for job_id, salary in stale])
+    missing = cursor.execute('''
+    SELECT id, requirements FROM jobs
+    WHERE requirements IS NOT NULL AND NOT EXISTS (SELECT 1 FROM job_skills WHERE job_id = jobs.id)
+    ''').fetchall()
+    cursor.executemany("INSERT OR IGNORE INTO job_skills (job_id, skill, position) VALUES (?, ?, ?)",
+                       [(job_id, skill, position) for job_id, requirements in missing
+                        for position, skill in enumerate(split_skills(requirements))])
+
+
+def _add_structured_job_fields(cursor):
+    # Typed salary range plus a skills join table, so salary-range and skill
+    # filters are index lookups instead of string matching
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(jobs)")]
+    for column, ddl in (('salary_min', 'INTEGER'), ('salary_max', 'INTEGER'), ('salary_currency', 'TEXT')):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE jobs ADD COLUMN {column} {ddl}")
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS job_skills (
+        job_id INTEGER NOT NULL,
+        skill TEXT NOT NULL COLLATE NOCASE,
+        position INTEGER NOT NULL,
+        PRIMARY KEY (job_id, skill)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills (skill, job_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_salary_range ON jobs (salary_currency, salary_max, salary_min)')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS job_skills_ad AFTER DELETE ON jobs BEGIN
+        DELETE FROM job_skills WHERE job_id = old.id;
+    END
+    ''')
+    backfill_job_fields(cursor)
+
+
+# A null roadmap step has nothing to show, and json_extract() fails on a
+# question that is not an object; both are skipped rather than failing the write
+_PREP_READ_MODEL_INSERT = '''
+    INSERT INTO prep_roadmap_steps (prep_id, position, step)
+    SELECT new.id, key, value FROM json_each(CASE WHEN json_valid(new.roadmap) THEN new.roadmap ELSE '[]' END)
+    WHERE type != 'null';
+    INSERT INTO prep_questions (prep_id, position, question, answer)
+    SELECT new.id, key, json_extract(value, '$.q'), json_extract(value, '$.a')
+    FROM json_each(CASE WHEN json_valid(new.questions) THEN new.questions ELSE '[]' END)
+    WHERE type = 'object' AND json_extract(value, '$.q') IS NOT NULL;
+'''
+_PREP_READ_MODEL_DELETE = '''
+    DELETE FROM prep_roadmap_steps WHERE prep_id = old.id;
+    DELETE FROM prep_questions WHERE prep_id = old.id;
+'''
+PREP_READ_MODEL_TRIGGERS = ('prep_read_model_ai', 'prep_read_model_ad', 'prep_read_model_au')
+
+
+def _create_prep_read_model_triggers(cursor):
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS prep_read_model_ai AFTER INSERT ON prep_materials BEGIN
+        {_PREP_READ_MODEL_INSERT}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS prep_read_model_ad AFTER DELETE ON prep_materials BEGIN
+        {_PREP_READ_MODEL_DELETE}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS prep_read_model_au AFTER UPDATE OF roadmap, questions ON prep_materials BEGIN
+        {_PREP_READ_MODEL_DELETE}
+        {_PREP_READ_MODEL_INSERT}
+    END
+    ''')
+
+
+def _rebuild_prep_read_model(cursor):
+    # Decode whatever rows already exist
+    cursor.execute("DELETE FROM prep_roadmap_steps")
+    cursor.execute("DELETE FROM prep_questions")
+    cursor.execute('''
+    INSERT INTO prep_roadmap_steps (prep_id, position, step)
+    SELECT p.id, j.key, j.value
+    FROM prep_materials p, json_each(CASE WHEN json_valid(p.roadmap) THEN p.roadmap ELSE '[]' END) j
+    WHERE j.type != 'null'
+    ''')
+    cursor.execute('''
+    INSERT INTO prep_questions (prep_id, position, question, answer)
+    SELECT p.id, j.key, json_extract(j.value, '$.q'), json_extract(j.value, '$.a')
+    FROM prep_materials p, json_each(CASE WHEN json_valid(p.questions) THEN p.questions ELSE '[]' END) j
+    WHERE j.type = 'object' AND json_extract(j.value, '$.q') IS NOT NULL
+    ''')
+
+
+def _add_prep_read_model(cursor):
+    # roadmap/questions decoded into rows once, at write time, by triggers;
+    # readers never json.loads them per request
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS prep_roadmap_steps (
+        prep_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        step TEXT NOT NULL,
+        PRIMARY KEY (prep_id, position)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS prep_questions (
+        prep_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        answer TEXT,
+        PRIMARY KEY (prep_id, position)
+    ) WITHOUT ROWID
+    ''')
+    _create_prep_read_model_triggers(cursor)
+    _rebuild_prep_read_model(cursor)
+
+
+def _add_practice_indexes(cursor):
+    # Topic pages are keyset ranges on (topic, id); per-topic counts by
+    # difficulty are answered from the second index without reading rows
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_practice_topic ON practice_problems (topic, id)")
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_practice_topic_difficulty ON practice_problems (topic, difficulty, id)
+    ''')
+
+
+def _drop_salary_text_index(cursor):
+    # ?salary= matched the display string ("₹20L - ₹40L") exactly and is
+    # gone; min_salary/max_salary filter on idx_jobs_salary_range instead
+    cursor.execute('DROP INDEX IF EXISTS idx_jobs_salary')
+
+
+def _skip_null_prep_elements(cursor):
+    # Databases past step 7 still have triggers that fail on a null roadmap
+    # step or a non-object question; replace them with the current ones
+    for name in PREP_READ_MODEL_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    _create_prep_read_model_triggers(cursor)
+    _rebuild_prep_read_model(cursor)
+
+
+MIGRATIONS = [
+    (1, _create_base_tables),
+    (2, _add_job_listing_indexes),
+    (3, _add_full_text_search),
+    (4, _add_meta_table),
+    (5, _add_job_natural_key),
+    (6, _add_structured_job_fields),
+    (7, _add_prep_read_model),
+    (8, _add_practice_indexes),
+    (9, _drop_salary_text_index),
+    (10, _skip_null_prep_elements),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Bump SEED_VERSION whenever the seed rows below change
+SEED_VERSION = 1
+
+SEED_JOBS = [
+    ("Software Engineer", "Google", "Bangalore, India", "₹20L - ₹40L", "Full-time", "2 days ago", "Work on cutting edge AI features.", "Python, React, System Design"),
+    ("Data Scientist", "Meta", "Remote", "$150k - $220k", "Full-time", "1 day ago", "Help us build the metaverse.", "ML, PyTorch, SQL"),
+    ("Product Manager", "Apple", "Mumbai, India", "₹15L - ₹30L", "Full-time", "5 hours ago", "Shape the future of consumer tech.", "Agile, Product Vision"),
+    ("Frontend Developer", "Netflix", "Hyderabad, India", "₹18L - ₹35L", "Contract", "3 days ago", "Build high performance UI for millions.", "Next.js, Tailwind, CSS"),
+    ("Backend Architect", "Amazon", "Pune, India", "₹25L - ₹50L", "Full-time", "1 week ago", "Architect scalable cloud services.", "Java, AWS, Microservices"),
+    ("UX Designer", "Airbnb", "Remote", "₹12L - ₹20L", "Full-time", "4 days ago", "Design beautiful travel experiences.", "Figma, User Research"),
+    ("Cloud Engineer", "Microsoft", "Delhi, India", "₹16L - ₹28L", "Full-time", "2 days ago", "Manage Azure infrastructure.", "Terraform, Kubernetes, Azure"),
+    ("ML Engineer", "NVIDIA", "Bangalore, India", "₹30L - ₹60L", "Full-time", "Today", "Optimizing deep learning kernels.", "C++, CUDA, DL"),
+    ("Junior Developer", "StartupX", "Remote", "₹6L - ₹10L", "Internship", "1 day ago", "Fast paced learning environment.", "HTML, CSS, JS"),
+    ("Security Analyst", "GlobalBank", "Gurgaon, India", "₹14L - ₹25L", "Full-time", "6 days ago", "Ensure banking security.", "Cybersecurity, PenTesting")
+]
+
+SEED_PREP = [
+    (
+        "Aptitude", "Quantitative Mastery", 
+        "Comprehensive guide to mastering numerical ability for placements.",
+        json.dumps(["Number Systems & Simplification", "Percentages, Profit & Loss", "Averages, Ratio & Proportion", "Time, Speed & Distance", "Simple & Compound Interest", "Permutation, Combination & Probability"]),
+        "Quantitative aptitude is the cornerstone of technical placements. To succeed, focus on two things: Speed and Accuracy.",
+        json.dumps([{"q": "A can do a work in 15 days and B in 20 days. If they work together for 4 days, what fraction of work is left?", "a": "8/15."}])
+    ),
+    (
+        "Coding", "Dynamic Programming Essentials", 
+        "Learn the art of optimizing recursive solutions using DP.",
+        json.dumps(["Recursion Fundamentals", "Memoization Strategy", "Tabulation (Bottom-Up)"]),
+        "Dynamic Programming (DP) is often the most feared topic in coding interviews. However, it's just recursion with storage.",
+        json.dumps([{"q": "What is the core difference between Memoization and Tabulation?", "a": "Memoization is Top-Down, Tabulation is Bottom-Up."}])
+    ),
+    (
+        "Interview", "System Design for Beginners", 
+        "Master the high-level architecture of scalable applications.",
+        json.dumps(["Introduction to Scalability", "Load Balancers", "Caching"]),
+        "In System Design, there is no single 'correct' answer; it's all about tradeoffs.",
+        json.dumps([{"q": "What is the CAP Theorem?", "a": "Consistency, Availability, and Partition Tolerance."}])
+    ),
+    (
+        "Aptitude", "Logical Reasoning", 
+        "Sharpen your analytical skills with logical puzzles and patterns.",
+        json.dumps(["Syllogisms", "Blood Relations", "Seating Arrangements"]),
+        "Logical reasoning tests your ability to structured thinking.",
+        json.dumps([{"q": "All cats are dogs. No dogs are birds. Can we say some cats are birds?", "a": "No."}])
+    ),
+    (
+        "Coding", "SQL for Data Science", 
+        "Essential data manipulation skills using SQL.",
+        json.dumps(["Relational Database Basics", "Advanced JOIN Operations"]),
+        "SQL is the bread and butter of data roles.",
+        json.dumps([{"q": "How do you find the second highest salary?", "a": "Using subqueries or LIMIT/OFFSET."}])
+    ),
+    (
+        "Interview", "HR Rounds: Top 50 Questions", 
+        "Master soft skills and behavioral questions for the final round.",
+        json.dumps(["The 'Tell Me About Yourself' pitch", "STAR Method"]),
+        "HR rounds check if you are a culture fit.",
+        json.dumps([{"q": "Why should we hire you?", "a": "Align your skills with the company mission."}])
+    )
+]
+
+SEED_COMPANIES = [
+    (
+        "TCS", 
+        "Tata Consultancy Services is a global leader in IT services, consulting & business solutions.",
+        "https://upload.wikimedia.org/wikipedia/commons/thumb/b/b1/Tata_Consultancy_Services_Logo.svg/512px-Tata_Consultancy_Services_Logo.svg.png",
+        "1. TCS NQT (National Qualifier Test), 2. Technical Interview, 3. HR Interview.",
+        "Numerical Ability, Verbal Ability, Reasoning Ability, Programming Logic, and Hands-on Coding.",
+        "Cognitive (60 mins), Technical (60 mins). Total duration: 180 mins.",
+        "60% throughout Tenth, Twelfth, Diploma, Graduation and Post-Graduation."
+    ),
+    (
+        "Wipro", 
+        "A leading global information technology, consulting and business process services company.",
+        "https://upload.wikimedia.org/wikipedia/commons/a/a0/Wipro_Primary_Logo_Color_RGB.svg",
+        "1. Online Assessment, 2. Technical Interview, 3. HR Interview.",
+        "Quantitative Aptitude, Logical Reasoning, Verbal Ability, Basic Programming, and Essay Writing.",
+        "Aptitude (48 mins), Written Communication (20 mins), Online Programming (60 mins).",
+        "60% in 10th and 12th standard. 60% or 6.0 CGPA in Graduation."
+    ),
+    (
+        "Google", 
+        "Google's mission is to organize the world's information and make it universally accessible and useful.",
+        "https://upload.wikimedia.org/wikipedia/commons/2/2f/Google_2015_logo.svg",
+        "1. Online Coding Challenge, 2. Technical Phone Screen, 3. Virtual Onsite (4-5 rounds).",
+        "Advanced Data Structures, Algorithms, System Design, and Googliness.",
+        "45 minutes per round with one or two complex problems.",
+        "Bachelor's degree in Computer Science or equivalent practical experience."
+    ),
+    (
+        "Microsoft", 
+        "Microsoft enables digital transformation for the era of an intelligent cloud and an intelligent edge.",
+        "https://upload.wikimedia.org/wikipedia/commons/9/96/Microsoft_logo_%282012%29.svg",
+        "1. Online Assessment, 2. Technical Interview Rounds, 3. System Design/HM Round.",
+        "DSA, Object-Oriented Design, System Design, and Behavioral Questions.",
+        "Multiple technical rounds (45-60 mins each).",
+        "CGPA of 7 or above. No standing backlogs."
+    ),
+    (
+        "Amazon", 
+        "Amazon is guided by four principles: customer obsession and passion for invention.",
+        "https://upload.wikimedia.org/wikipedia/commons/a/a9/Amazon_logo.svg",
+        "1. Online Assessment, 2. Technical Phone Screen, 3. Virtual Onsite (The 'Loop').",
+        "Data Structures, Algorithms, Scalability, and Amazon's Leadership Principles.",
+        "Heavy emphasis on Leadership Principles. 4-5 rounds.",
+        "Strong academic record. Proficiency in at least one modern programming language."
+    )
+]
+
+SEED_PRACTICE = [
+    ("NUMBERS", "Climbing Stairs", "https://leetcode.com/problems/climbing-stairs", "Easy"),
+    ("NUMBERS", "Check if a given year is leap year", "https://www.geeksforgeeks.org/program-check-given-year-leap-year/", "Easy"),
+    ("NUMBERS", "Prime Numbers", "https://www.geeksforgeeks.org/prime-numbers/", "Easy"),
+    ("NUMBERS", "Valid Perfect Square", "https://leetcode.com/problems/valid-perfect-square/", "Easy"),
+    ("NUMBERS", "Add Digits", "https://leetcode.com/problems/add-digits/", "Easy"),
+    ("NUMBERS", "Power of Two", "https://leetcode.com/problems/power-of-two/", "Easy"),
+    ("ARRAYS", "Two Sum", "https://leetcode.com/problems/two-sum", "Easy"),
+    ("ARRAYS", "Move Zeroes", "https://leetcode.com/problems/move-zeroes", "Easy"),
+    ("ARRAYS", "Contains Duplicate", "https://leetcode.com/problems/contains-duplicate", "Easy"),
+    ("ARRAYS", "Best Time to Buy and Sell Stock", "https://leetcode.com/problems/best-time-to-buy-and-sell-stock/", "Easy"),
+    ("ARRAYS", "Maximum Subarray (Kadane's)", "https://leetcode.com/problems/maximum-subarray/", "Medium"),
+    ("ARRAYS", "Rotate Array", "https://leetcode.com/problems/rotate-array/", "Medium"),
+    ("ARRAYS", "3Sum", "https://leetcode.com/problems/3sum/", "Medium"),
+    ("ARRAYS", "Product of Array Except Self", "https://leetcode.com/problems/product-of-array-except-self/", "Medium"),
+    ("STRINGS", "Reverse String", "https://leetcode.com/problems/reverse-string/", "Easy"),
+    ("STRINGS", "Valid Anagram", "https://leetcode.com/problems/valid-anagram/", "Easy"),
+    ("STRINGS", "Valid Palindrome", "https://leetcode.com/problems/valid-palindrome/", "Easy"),
+    ("STRINGS", "Longest Common Prefix", "https://leetcode.com/problems/longest-common-prefix/", "Easy"),
+    ("STRINGS", "Longest Substring Without Repeating Characters", "https://leetcode.com/problems/longest-substring-without-repeating-characters/", "Medium"),
+    ("STRINGS", "Group Anagrams", "https://leetcode.com/problems/group-anagrams/", "Medium"),
+    ("RECURSION", "Fibonacci Number", "https://leetcode.com/problems/fibonacci-number/", "Easy"),
+    ("RECURSION", "Permutations", "https://leetcode.com/problems/permutations/", "Medium"),
+    ("RECURSION", "Subsets", "https://leetcode.com/problems/subsets/", "Medium"),
+    ("SORTING", "Merge Sorted Array", "https://leetcode.com/problems/merge-sorted-array/", "Easy"),
+    ("SORTING", "Sort Colors", "https://leetcode.com/problems/sort-colors/", "Medium"),
+    ("SORTING", "Kth Largest Element in an Array", "https://leetcode.com/problems/kth-largest-element-in-an-array/", "Medium"),
+    ("DP", "Coin Change", "https://leetcode.com/problems/coin-change/", "Medium"),
+    ("DP", "Longest Increasing Subsequence", "https://leetcode.com/problems/longest-increasing-subsequence/", "Medium"),
+    ("DP", "House Robber", "https://leetcode.com/problems/house-robber/", "Medium"),
+    ("DP", "Edit Distance", "https://leetcode.com/problems/edit-distance/", "Hard")
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def seed_version(conn):
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'seed_version'").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0]) if row else 0
+
+
+def needs_init(conn):
+    """Cheap check used on every boot: header, PK and schema lookups, no scans."""
+    return (schema_version(conn) < SCHEMA_VERSION or seed_version(conn) < SEED_VERSION
+            or jobs_fts_triggers_missing(conn))
+
+
+def migrate(conn):
+    cursor = conn.cursor()
+    current = schema_version(conn)
+    for version, step in MIGRATIONS:
+        if version > current:
+            step(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+    return schema_version(conn)
+
+
+def seed(conn):
+    """Insert any seed rows that are missing, keyed on each table's natural key.
+
+    Safe to re-run: existing rows (including ones loaded from feeds) are left
+    alone, so bumping SEED_VERSION only adds what is new.
+    """
+    cursor = conn.cursor()
+    now = int(time.time())
+    cursor.executemany('''
+    INSERT INTO jobs (title, company, location, salary, type, posted_date, posted_at, description, requirements)
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9
+    WHERE NOT EXISTS (SELECT 1 FROM jobs WHERE company = ?2 AND title = ?1 AND location = ?3)
+    ''', [job[:6] + (parse_posted_date(job[5], now),) + job[6:] for job in SEED_JOBS])
+    backfill_job_fields(cursor)
 
     cursor.executemany('''
     INSERT INTO prep_materials (category, title, description, roadmap, notes, questions)
-    VALUES (?, ?, ?, ?, ?, ?)
-    ''', prep)
-
-    # Seed Companies
-    companies_data = [
-        (
-            "TCS", 
-            "Tata Consultancy Services is a global leader in IT services, consulting & business solutions.",
-            "https://upload.wikimedia.org/wikipedia/commons/thumb/b/b1/Tata_Consultancy_Services_Logo.svg/512px-Tata_Consultancy_Services_Logo.svg.png",
-            "1. TCS NQT (National Qualifier Test), 2. Technical Interview, 3. HR Interview.",
-            "Numerical Ability, Verbal Ability, Reasoning Ability, Programming Logic, and Hands-on Coding.",
-            "Cognitive (60 mins), Technical (60 mins). Total duration: 180 mins.",
-            "60% throughout Tenth, Twelfth, Diploma, Graduation and Post-Graduation."
-        ),
-        (
-            "Wipro", 
-            "A leading global information technology, consulting and business process services company.",
-            "https://upload.wikimedia.org/wikipedia/commons/a/a0/Wipro_Primary_Logo_Color_RGB.svg",
-            "1. Online Assessment, 2. Technical Interview, 3. HR Interview.",
-            "Quantitative Aptitude, Logical Reasoning, Verbal Ability, Basic Programming, and Essay Writing.",
-            "Aptitude (48 mins), Written Communication (20 mins), Online Programming (60 mins).",
-            "60% in 10th and 12th standard. 60% or 6.0 CGPA in Graduation."
-        ),
-        (
-            "Google", 
-            "Google's mission is to organize the world's information and make it universally accessible and useful.",
-            "https://upload.wikimedia.org/wikipedia/commons/2/2f/Google_2015_logo.svg",
-            "1. Online Coding Challenge, 2. Technical Phone Screen, 3. Virtual Onsite (4-5 rounds).",
-            "Advanced Data Structures, Algorithms, System Design, and Googliness.",
-            "45 minutes per round with one or two complex problems.",
-            "Bachelor's degree in Computer Science or equivalent practical experience."
-        ),
-        (
-            "Microsoft", 
-            "Microsoft enables digital transformation for the era of an intelligent cloud and an intelligent edge.",
-            "https://upload.wikimedia.org/wikipedia/commons/9/96/Microsoft_logo_%282012%29.svg",
-            "1. Online Assessment, 2. Technical Interview Rounds, 3. System Design/HM Round.",
-            "DSA, Object-Oriented Design, System Design, and Behavioral Questions.",
-            "Multiple technical rounds (45-60 mins each).",
-            "CGPA of 7 or above. No standing backlogs."
-        ),
-        (
-            "Amazon", 
-            "Amazon is guided by four principles: customer obsession and passion for invention.",
-            "https://upload.wikimedia.org/wikipedia/commons/a/a9/Amazon_logo.svg",
-            "1. Online Assessment, 2. Technical Phone Screen, 3. Virtual Onsite (The 'Loop').",
-            "Data Structures, Algorithms, Scalability, and Amazon's Leadership Principles.",
-            "Heavy emphasis on Leadership Principles. 4-5 rounds.",
-            "Strong academic record. Proficiency in at least one modern programming language."
-        )
-    ]
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6
+    WHERE NOT EXISTS (SELECT 1 FROM prep_materials WHERE category = ?1 AND title = ?2)
+    ''', SEED_PREP)
 
     cursor.executemany('''
     INSERT INTO companies (name, description, logo_url, hiring_process, syllabus, exam_pattern, eligibility)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', companies_data)
-
-    # Seed Practice Problems
-    practice = [
-        ("NUMBERS", "Climbing Stairs", "https://leetcode.com/problems/climbing-stairs", "Easy"),
-        ("NUMBERS", "Check if a given year is leap year", "https://www.geeksforgeeks.org/program-check-given-year-leap-year/", "Easy"),
-        ("NUMBERS", "Prime Numbers", "https://www.geeksforgeeks.org/prime-numbers/", "Easy"),
-        ("NUMBERS", "Valid Perfect Square", "https://leetcode.com/problems/valid-perfect-square/", "Easy"),
-        ("NUMBERS", "Add Digits", "https://leetcode.com/problems/add-digits/", "Easy"),
-        ("NUMBERS", "Power of Two", "https://leetcode.com/problems/power-of-two/", "Easy"),
-        ("ARRAYS", "Two Sum", "https://leetcode.com/problems/two-sum", "Easy"),
-        ("ARRAYS", "Move Zeroes", "https://leetcode.com/problems/move-zeroes", "Easy"),
-        ("ARRAYS", "Contains Duplicate", "https://leetcode.com/problems/contains-duplicate", "Easy"),
-        ("ARRAYS", "Best Time to Buy and Sell Stock", "https://leetcode.com/problems/best-time-to-buy-and-sell-stock/", "Easy"),
-        ("ARRAYS", "Maximum Subarray (Kadane's)", "https://leetcode.com/problems/maximum-subarray/", "Medium"),
-        ("ARRAYS", "Rotate Array", "https://leetcode.com/problems/rotate-array/", "Medium"),
-        ("ARRAYS", "3Sum", "https://leetcode.com/problems/3sum/", "Medium"),
-        ("ARRAYS", "Product of Array Except Self", "https://leetcode.com/problems/product-of-array-except-self/", "Medium"),
-        ("STRINGS", "Reverse String", "https://leetcode.com/problems/reverse-string/", "Easy"),
-        ("STRINGS", "Valid Anagram", "https://leetcode.com/problems/valid-anagram/", "Easy"),
-        ("STRINGS", "Valid Palindrome", "https://leetcode.com/problems/valid-palindrome/", "Easy"),
-        ("STRINGS", "Longest Common Prefix", "https://leetcode.com/problems/longest-common-prefix/", "Easy"),
-        ("STRINGS", "Longest Substring Without Repeating Characters", "https://leetcode.com/problems/longest-substring-without-repeating-characters/", "Medium"),
-        ("STRINGS", "Group Anagrams", "https://leetcode.com/problems/group-anagrams/", "Medium"),
-        ("RECURSION", "Fibonacci Number", "https://leetcode.com/problems/fibonacci-number/", "Easy"),
-        ("RECURSION", "Permutations", "https://leetcode.com/problems/permutations/", "Medium"),
-        ("RECURSION", "Subsets", "https://leetcode.com/problems/subsets/", "Medium"),
-        ("SORTING", "Merge Sorted Array", "https://leetcode.com/problems/merge-sorted-array/", "Easy"),
-        ("SORTING", "Sort Colors", "https://leetcode.com/problems/sort-colors/", "Medium"),
-        ("SORTING", "Kth Largest Element in an Array", "https://leetcode.com/problems/kth-largest-element-in-an-array/", "Medium"),
-        ("DP", "Coin Change", "https://leetcode.com/problems/coin-change/", "Medium"),
-        ("DP", "Longest Increasing Subsequence", "https://leetcode.com/problems/longest-increasing-subsequence/", "Medium"),
-        ("DP", "House Robber", "https://leetcode.com/problems/house-robber/", "Medium"),
-        ("DP", "Edit Distance", "https://leetcode.com/problems/edit-distance/", "Hard")
-    ]
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7
+    WHERE NOT EXISTS (SELECT 1 FROM companies WHERE name = ?1)
+    ''', SEED_COMPANIES)
 
     cursor.executemany('''
     INSERT INTO practice_problems (topic, problem_name, link, difficulty)
-    VALUES (?, ?, ?, ?)
-    ''', practice)
+    SELECT ?1, ?2, ?3, ?4
+    WHERE NOT EXISTS (SELECT 1 FROM practice_problems WHERE topic = ?1 AND problem_name = ?2)
+    ''', SEED_PRACTICE)
+
+    cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seed_version', ?)", (str(SEED_VERSION),))
+
+
+def init_db(conn):
+    """Bring a database up to the current schema and seed, in one transaction.
 
-    conn.commit()
+    A database that is already current is left untouched, so this is cheap
+    to call on every process start.
+    """
+    if not needs_init(conn):
+        return
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        migrate(conn)
+        if jobs_fts_triggers_missing(conn):
+            restore_jobs_fts(conn.cursor())
+        if seed_version(conn) < SEED_VERSION:
+            seed(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
     # Connection is managed externally, do not close here
 
 if __name__ == "__main__":
-    if os.path.exists('horizon.db'):
-        os.remove('horizon.db')
+    import sys
+    if '--reset' in sys.argv:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists('horizon.db' + suffix):
+                os.remove('horizon.db' + suffix)
     conn = sqlite3.connect('horizon.db')
     init_db(conn)
+    # Ship the file in rollback-journal mode: a WAL file cannot be opened on
+    # a read-only filesystem without -shm. The app's writer turns WAL on.
+    conn.execute("PRAGMA journal_mode = DELETE")
+    print(f"horizon.db at schema version {schema_version(conn)}, seed version {seed_version(conn)}.")
     conn.close()
-    print("Database with Jobs, Prep Materials, Companies, and Practice Questions initialized successfully.")
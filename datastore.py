@@ -0,0 +1,213 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from starlette.concurrency import run_in_threadpool
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("LMT_DB_PATH", os.path.join(BASE_DIR, "horizon.db"))
+READ_POOL_SIZE = int(os.environ.get("LMT_DB_READERS", "8"))
+BUSY_TIMEOUT = 5.0
+VERSION_TTL = float(os.environ.get("LMT_VERSION_TTL", "1.0"))
+
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+class ConnectionPool:
+    """A bounded pool of sqlite3 connections.
+
+    Connections are opened lazily up to `size`; callers beyond that wait for
+    one to be released. A connection is only ever used by one thread at a
+    time, which is what makes check_same_thread=False safe here.
+    """
+
+    def __init__(self, factory, size, timeout=BUSY_TIMEOUT):
+        self._factory = factory
+        self._size = size
+        self._timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self._size:
+                self._opened += 1
+                try:
+                    return self._factory()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self._timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"No connection available after {self._timeout}s")
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
+
+
+class Database:
+    """File-backed WAL database with a reader pool and a single writer.
+
+    WAL lets any number of readers (across threads and uvicorn worker
+    processes) run alongside one writer. GET handlers go through read(),
+    which uses read-only connections; everything runs on the threadpool so
+    the event loop is never blocked on SQLite.
+    """
+
+    def __init__(self, path=DB_PATH, readers=READ_POOL_SIZE, factory=sqlite3.Connection):
+        self.path = path
+        # sqlite3.Connection subclass for pooled connections (e.g. metrics.TimedConnection)
+        self.factory = factory
+        self._readers = ConnectionPool(lambda: self._connect(readonly=True), readers)
+        self._writer = ConnectionPool(lambda: self._connect(readonly=False), 1)
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._probe = None
+        self._probe_value = None
+        self._checked_at = float("-inf")
+
+    def _connect(self, readonly, factory=None):
+        factory = factory or self.factory
+        if readonly:
+            conn = self._connect_readonly(factory)
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False, factory=factory)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA cache_size = -16000")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def _connect_readonly(self, factory):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True,
+                               timeout=BUSY_TIMEOUT, check_same_thread=False, factory=factory)
+        try:
+            # The file is only opened on first use; do it here to see if it works
+            conn.execute("PRAGMA schema_version")
+            return conn
+        except sqlite3.OperationalError:
+            conn.close()
+            # Where the directory is writable the failure is real ("database
+            # is locked" past BUSY_TIMEOUT, say): reading that file without
+            # locks would serve stale or half-written pages
+            if os.access(os.path.dirname(os.path.abspath(self.path)), os.W_OK):
+                raise
+        # A WAL file on a read-only filesystem (a serverless bundle): SQLite
+        # cannot create the -shm index a WAL reader needs. Nothing can write
+        # the file there either, so read it as immutable, without locks.
+        return sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True,
+                               timeout=BUSY_TIMEOUT, check_same_thread=False, factory=factory)
+
+    def initialize(self, init, needs_init):
+        """Migrate and seed the database file only if it is out of date.
+
+        The up-to-date check runs on a read-only connection and costs two
+        header lookups, so a warm database adds nothing to cold start and
+        read-only deployments never open it for writing.
+        """
+        if os.path.exists(self.path):
+            with self.reader() as conn:
+                if not needs_init(conn):
+                    return
+        with self._writer.connection() as conn:
+            # Take the write lock first so concurrent workers migrate only once
+            conn.execute("BEGIN IMMEDIATE")
+            init(conn)
+            if conn.in_transaction:
+                # Another worker got there first and init had nothing to do
+                conn.rollback()
+
+    @contextmanager
+    def reader(self):
+        with self._readers.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def writer(self):
+        with self._writer.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def bump_version(self):
+        with self._version_lock:
+            self._version += 1
+
+    def data_version(self):
+        """Counter that moves whenever the data may have changed.
+
+        Writes through this Database bump it immediately. Commits from other
+        processes (other workers, the ingestion CLI) are picked up by polling
+        SQLite's PRAGMA data_version on a dedicated connection, at most once
+        per VERSION_TTL seconds; in between this never touches SQLite.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < VERSION_TTL:
+            return self._version
+        with self._version_lock:
+            if self._probe is None:
+                self._probe = self._connect(readonly=True, factory=sqlite3.Connection)
+            value = self._probe.execute("PRAGMA data_version").fetchone()[0]
+            if self._probe_value is not None and value != self._probe_value:
+                self._version += 1
+            self._probe_value = value
+            self._checked_at = now
+            return self._version
+
+    def _run_read(self, fn, args, kwargs):
+        with self.reader() as conn:
+            return fn(conn, *args, **kwargs)
+
+    def _run_write(self, fn, args, kwargs):
+        with self.writer() as conn:
+            result = fn(conn, *args, **kwargs)
+        self.bump_version()
+        return result
+
+    async def read(self, fn, *args, **kwargs):
+        return await run_in_threadpool(self._run_read, fn, args, kwargs)
+
+    async def write(self, fn, *args, **kwargs):
+        return await run_in_threadpool(self._run_write, fn, args, kwargs)
+
+    def close(self):
+        self._readers.close()
+        self._writer.close()
+        with self._version_lock:
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
@@ -0,0 +1,291 @@
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from database import (MAX_INTEGER, drop_jobs_fts_triggers, parse_posted_date, parse_salary, replace_job_skills,
+                      restore_jobs_fts)
+
+BATCH_SIZE = 50000
+MAX_REPORTED_ERRORS = 20
+FORMATS = ('jsonl', 'csv')
+
+REQUIRED_FIELDS = ('title', 'company', 'location', 'type')
+FIELD_LIMITS = {
+    'title': 200,
+    'company': 200,
+    'location': 200,
+    'type': 50,
+    'salary': 100,
+    'posted_date': 50,
+    'description': 20000,
+    'requirements': 2000,
+}
+
+_WHITESPACE = re.compile(r'\s+')
+# 9999-12-31T23:59:59Z, the last instant a posted_date can be formatted for
+MAX_TIMESTAMP = 253402300799
+
+UPSERT_SQL = '''
+INSERT INTO jobs (title, company, location, salary, salary_min, salary_max, salary_currency,
+                  type, posted_date, posted_at, description, requirements)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (company, title, location) DO UPDATE SET
+    salary = excluded.salary,
+    salary_min = excluded.salary_min,
+    salary_max = excluded.salary_max,
+    salary_currency = excluded.salary_currency,
+    type = excluded.type,
+    posted_date = excluded.posted_date,
+    posted_at = excluded.posted_at,
+    description = excluded.description,
+    requirements = excluded.requirements
+'''
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def read_records(stream, fmt):
+    """Yield one dict per record from a text stream, without buffering it.
+
+    Unparseable JSONL lines and CSV rows (a NUL byte, broken quoting) are
+    yielded as InvalidRecord instances rather than raised, so one bad line
+    does not end the stream.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream, strict=True)
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                yield InvalidRecord(f"invalid CSV ({exc})")
+                continue
+            yield record
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield InvalidRecord(f"invalid JSON ({exc})")
+            continue
+        if not isinstance(record, dict):
+            yield InvalidRecord("expected a JSON object")
+            continue
+        yield record
+
+
+def _clean(value, field):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        value = ', '.join(str(v) for v in value)
+    value = _WHITESPACE.sub(' ', str(value)).strip()
+    # Older csv modules raise on NUL; reject it the same way everywhere
+    if '\0' in value:
+        raise InvalidRecord(f"{field} contains a NUL byte")
+    if len(value) > FIELD_LIMITS[field]:
+        raise InvalidRecord(f"{field} longer than {FIELD_LIMITS[field]} characters")
+    return value or None
+
+
+def _whole_number(value, field, high=MAX_INTEGER):
+    # NaN, Infinity, 1e400 and values past the column's range are bad records,
+    # not errors that end the whole ingest
+    try:
+        number = value if isinstance(value, int) else float(value)
+        if not 0 <= number <= high:
+            raise ValueError(value)
+        return int(number)
+    except (TypeError, ValueError, OverflowError):
+        raise InvalidRecord(f"{field} must be a number from 0 to {high}")
+
+
+def _posted_at(record, now):
+    value = record.get('posted_at')
+    if value in (None, ''):
+        return _whole_number(parse_posted_date(record.get('posted_date'), now), 'posted_date', MAX_TIMESTAMP)
+    if isinstance(value, (int, float)) or str(value).isdigit():
+        return _whole_number(value, 'posted_at', MAX_TIMESTAMP)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise InvalidRecord(f"posted_at {value!r} is neither a unix timestamp nor ISO 8601")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return _whole_number(parsed.timestamp(), 'posted_at', MAX_TIMESTAMP)
+
+
+def _salary_range(record, salary):
+    # Explicit salary_min/salary_max/salary_currency win over parsing the display text
+    salary_min, salary_max, currency = parse_salary(salary)
+    if record.get('salary_min') not in (None, ''):
+        salary_min = _whole_number(record['salary_min'], 'salary_min')
+    if record.get('salary_max') not in (None, ''):
+        salary_max = _whole_number(record['salary_max'], 'salary_max')
+    if record.get('salary_currency'):
+        currency = str(record['salary_currency']).strip().upper()[:3]
+    return salary_min, salary_max, currency
+
+
+def normalize(record, now=None):
+    """Validate one feed record and return the row tuple for UPSERT_SQL."""
+    now = int(now if now is not None else time.time())
+    fields = {field: _clean(record.get(field), field) for field in FIELD_LIMITS}
+    missing = [field for field in REQUIRED_FIELDS if not fields[field]]
+    if missing:
+        raise InvalidRecord(f"missing {', '.join(missing)}")
+
+    posted_at = _posted_at(record, now)
+    posted_date = fields['posted_date'] or datetime.fromtimestamp(posted_at, timezone.utc).strftime('%d %b %Y')
+    return (fields['title'], fields['company'], fields['location'], fields['salary'],
+            *_salary_range(record, fields['salary']), fields['type'],
+            posted_date, posted_at, fields['description'], fields['requirements'])
+
+
+def new_report():
+    return {'read': 0, 'upserted': 0, 'invalid': 0, 'batches': 0, 'errors': []}
+
+
+def finish_report(report, started):
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    report['rows_per_sec'] = round(report['upserted'] / report['seconds']) if report['seconds'] else None
+    return report
+
+
+def normalized_batches(stream, fmt, batch_size, report):
+    """Yield lists of up to batch_size UPSERT_SQL row tuples from a feed.
+
+    Records are counted in `report`; invalid ones are skipped and the
+    first MAX_REPORTED_ERRORS of them described there.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    now = int(time.time())
+    batch = []
+    for record in read_records(stream, fmt):
+        report['read'] += 1
+        try:
+            if isinstance(record, InvalidRecord):
+                raise record
+            batch.append(normalize(record, now))
+        except InvalidRecord as exc:
+            report['invalid'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append(f"record {report['read']}: {exc}")
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _tune_for_bulk_load(conn):
+    previous_cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    # Let the WAL grow during the load and checkpoint once at the end
+    conn.execute("PRAGMA wal_autocheckpoint = 0")
+    return previous_cache_size
+
+
+def ingest_stream(conn, stream, fmt='jsonl', batch_size=BATCH_SIZE):
+    """Upsert a JSONL/CSV job feed into `jobs`, one transaction per batch.
+
+    Once a feed fills a whole batch, the per-row jobs_fts triggers are
+    dropped and the FTS index is rebuilt once at the end instead (restored
+    even if the load fails part-way); feeds smaller than one batch keep the
+    triggers, which is cheaper than a full rebuild. A process killed before
+    the restore leaves them dropped; database.init_db puts them back (and
+    rebuilds) on the next start. Rows are keyed on (company, title,
+    location), so duplicates within or across feeds update the existing
+    posting; its salary range and job_skills rows are rewritten in the same
+    transaction.
+    """
+    started = time.perf_counter()
+    report = new_report()
+
+    if conn.in_transaction:
+        conn.commit()
+    previous_cache_size = _tune_for_bulk_load(conn)
+    fts_deferred = False
+    try:
+        for batch in normalized_batches(stream, fmt, batch_size, report):
+            if len(batch) >= batch_size and not fts_deferred:
+                drop_jobs_fts_triggers(conn.cursor())
+                fts_deferred = True
+            _flush(conn, batch, report)
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        if fts_deferred:
+            restore_jobs_fts(conn.cursor())
+            conn.commit()
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA wal_autocheckpoint = 1000")
+        conn.execute(f"PRAGMA cache_size = {int(previous_cache_size)}")
+
+    return finish_report(report, started)
+
+
+def _flush(conn, batch, report):
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany(UPSERT_SQL, batch)
+    replace_job_skills(conn.cursor(), ((row[1], row[0], row[2], row[11]) for row in batch))
+    conn.commit()
+    report['upserted'] += len(batch)
+    report['batches'] += 1
+
+
+def detect_format(name, content_type=None):
+    if content_type and 'csv' in content_type:
+        return 'csv'
+    if name and name.lower().endswith('.csv'):
+        return 'csv'
+    return 'jsonl'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a JSONL or CSV job feed into the jobs table")
+    parser.add_argument('path', help="feed file, or - for stdin")
+    parser.add_argument('--format', choices=FORMATS, help="default: from the file extension")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--db', default=None, help="database path (default: LMT_DB_PATH or horizon.db)")
+    args = parser.parse_args()
+
+    import sqlite3
+    from database import init_db
+    from datastore import DB_PATH
+
+    conn = sqlite3.connect(args.db or DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode = WAL")
+    init_db(conn)
+    fmt = args.format or detect_format(args.path)
+    if args.path == '-':
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+        report = ingest_stream(conn, stream, fmt, args.batch_size)
+    else:
+        with open(args.path, encoding='utf-8', newline='') as stream:
+            report = ingest_stream(conn, stream, fmt, args.batch_size)
+    conn.close()
+
+    print(f"read {report['read']}, upserted {report['upserted']}, invalid {report['invalid']} "
+          f"in {report['batches']} batches, {report['seconds']}s ({report['rows_per_sec']} rows/sec)")
+    for error in report['errors']:
+        print(f"  {error}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
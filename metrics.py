@@ -0,0 +1,335 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+ENABLED = os.environ.get("LMT_METRICS", "1") != "0"
+SERVER_TIMING = os.environ.get("LMT_SERVER_TIMING", "0") == "1"
+SLOW_QUERY_SECONDS = float(os.environ.get("LMT_SLOW_QUERY_MS", "100")) / 1000
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+logger = logging.getLogger("lmt.sql")
+
+# Per-request phase totals ({phase: [seconds, count]}) for Server-Timing.
+# The dict is shared with threadpool workers through the copied context.
+_phases = ContextVar("lmt_request_phases", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, seconds, *labels):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [per-bucket counts..., sum, count]
+                state = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += seconds
+            state[-1] += 1
+
+    def _samples(self, key, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), state[:len(self.buckets)] + [None]):
+            cumulative = state[-1] if count is None else cumulative + count
+            labels = _format_labels(self.labels, key, [("le", _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+        lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+REGISTRY = []
+
+REQUEST_SECONDS = Histogram("lmt_http_request_duration_seconds", "HTTP request latency by route.",
+                            ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = Gauge("lmt_http_requests_in_flight", "HTTP requests currently being served.")
+SQL_SECONDS = Histogram("lmt_sql_statement_duration_seconds",
+                        "Database statement time, including row fetching, by operation and table.",
+                        ("operation", "table"), FAST_BUCKETS)
+SLOW_QUERIES = Counter("lmt_sql_slow_statements_total",
+                       "SQLite statements slower than LMT_SLOW_QUERY_MS.", ("operation", "table"))
+TEMPLATE_SECONDS = Histogram("lmt_template_render_duration_seconds", "Jinja2 render time by template.",
+                             ("template",), FAST_BUCKETS)
+
+
+def expose():
+    """All metrics of this process in the Prometheus text format (0.0.4).
+
+    Each uvicorn worker keeps its own registry; Prometheus sums them when
+    it scrapes every worker.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+def record_phase(phase, seconds):
+    phases = _phases.get()
+    if phases is not None:
+        total = phases.setdefault(phase, [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+
+
+@contextmanager
+def time_template(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        TEMPLATE_SECONDS.observe(elapsed, name)
+        record_phase("render", elapsed)
+
+
+_STATEMENT = re.compile(r"^\s*(\w+)(?:.*?\b(?:FROM|INTO|UPDATE|TABLE|EXISTS)\s+(?:main\.|temp\.)?(\w+))?",
+                        re.IGNORECASE | re.DOTALL)
+
+
+def _statement_labels(sql):
+    # Label by operation and first table so cardinality stays bounded even
+    # though list_jobs builds its WHERE clause dynamically
+    match = _STATEMENT.match(sql)
+    if not match:
+        return "OTHER", ""
+    return match.group(1).upper(), (match.group(2) or "").lower()
+
+
+def observe_statement(sql, elapsed):
+    operation, table = _statement_labels(sql)
+    SQL_SECONDS.observe(elapsed, operation, table)
+    record_phase("db", elapsed)
+    if elapsed >= SLOW_QUERY_SECONDS:
+        SLOW_QUERIES.inc(operation, table)
+        logger.warning("slow query (%.1f ms): %s", elapsed * 1000, " ".join(sql.split()))
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that times each statement from execute() until its rows are
+    exhausted, since SQLite does most of a SELECT's work while stepping."""
+
+    _sql = None
+    _elapsed = 0.0
+
+    def _start(self, sql):
+        self._finish()
+        self._sql = sql
+        self._elapsed = 0.0
+
+    def _finish(self):
+        if self._sql is None:
+            return
+        sql, elapsed = self._sql, self._elapsed
+        self._sql = None
+        observe_statement(sql, elapsed)
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._elapsed += time.perf_counter() - started
+
+    def execute(self, sql, parameters=()):
+        self._start(sql)
+        self._timed(super().execute, sql, parameters)
+        if self.description is None:
+            # No result rows: the statement already ran to completion
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start(sql)
+        self._timed(super().executemany, sql, seq_of_parameters)
+        self._finish()
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._elapsed += time.perf_counter() - started
+            self._finish()
+            raise
+        self._elapsed += time.perf_counter() - started
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # conn.execute(...).fetchone() never exhausts the cursor; record the
+        # statement when the cursor is dropped instead
+        self._finish()
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection factory whose statements are timed (TimedCursor).
+
+    Connection.execute() normally bypasses cursor subclasses, so the
+    shortcut methods are routed through cursor() here.
+    """
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory():
+    return TimedConnection if ENABLED else sqlite3.Connection
+
+
+def _server_timing(phases, total):
+    entries = [f'{phase};dur={seconds * 1000:.2f};desc="{count}x"' for phase, (seconds, count) in phases.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries).encode("latin-1")
+
+
+def _route_label(scope):
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounted apps (StaticFiles) leave their prefix in root_path instead
+    mount = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+    return f"{mount}/{{path}}" if mount else "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests.
+
+    Routes are labelled by their path template ("/prep/{prep_id}"), never
+    the raw path. With LMT_SERVER_TIMING=1 each response also carries a
+    Server-Timing header with its SQL and render time.
+    """
+
+    def __init__(self, app, server_timing=SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        phases = {}
+        token = _phases.set(phases)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(phases, time.perf_counter() - started)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            _phases.reset(token)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], _route_label(scope), str(status))
@@ -0,0 +1,165 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import brotli
+except ImportError:  # optional: pages are still served gzip/identity
+    brotli = None
+
+# 0 turns response caching off: every request queries and renders (the
+# benchmark harness uses this to measure the code behind the cache)
+MAX_ENTRIES = int(os.environ.get("LMT_PAGE_CACHE_SIZE", "1024"))
+
+
+class CachedPage:
+    """One rendered page in every encoding we serve, plus its validators."""
+
+    __slots__ = ("version", "bodies", "etag", "last_modified", "modified_at")
+
+    def __init__(self, version, body, gzip_level=9, brotli_quality=11):
+        self.version = version
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=gzip_level)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=brotli_quality)
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.modified_at = int(time.time())
+        self.last_modified = formatdate(self.modified_at, usegmt=True)
+
+    def etag_for(self, encoding):
+        # Strong ETags must differ between byte-different representations
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.etag}{suffix}"'
+
+
+def preferred_encoding(accept_encoding, available):
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(token.strip().lower())
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def _not_modified(request, page):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return bool(tags & {page.etag_for(encoding) for encoding in page.bodies})
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= page.modified_at
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class PageCache:
+    """In-memory LRU of rendered HTML pages, keyed by route and parameters.
+
+    Each entry remembers the data version it was rendered at; a lookup with
+    a newer version misses, so a write anywhere invalidates every page
+    without tracking which rows a page depends on.
+
+    Bodies are compressed once, on insert; caches whose keys rarely repeat
+    (API queries) should use cheaper levels than the defaults.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, gzip_level=9, brotli_quality=11):
+        self.max_entries = max_entries
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._entries = OrderedDict()
+        # (key, version) -> the task producing that page right now
+        self._inflight = {}
+
+    async def fetch(self, key, version, produce):
+        """The page for `key` at `version`, produced by `await produce()` on a miss.
+
+        Requests that miss together share one produce() and one compression,
+        which runs on the threadpool rather than the event loop. produce()
+        returning None (nothing to show) is passed through uncached.
+        """
+        page = self.get(key, version)
+        if page is not None:
+            return page
+        flight = (key, version)
+        task = self._inflight.get(flight)
+        if task is None:
+            task = asyncio.ensure_future(self._produce(key, version, produce))
+            self._inflight[flight] = task
+            task.add_done_callback(lambda done: self._landed(flight, done))
+        # A waiter that disconnects must not cancel the others' page
+        return await asyncio.shield(task)
+
+    async def _produce(self, key, version, produce):
+        body = await produce()
+        if body is None:
+            return None
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        page = await run_in_threadpool(CachedPage, version, body, self.gzip_level, self.brotli_quality)
+        return self._store(key, page)
+
+    def _landed(self, flight, task):
+        self._inflight.pop(flight, None)
+        if not task.cancelled():
+            # Every waiter may have gone; the error is theirs, not the loop's
+            task.exception()
+
+    def get(self, key, version):
+        page = self._entries.get(key)
+        if page is None or page.version != version:
+            return None
+        self._entries.move_to_end(key)
+        return page
+
+    def put(self, key, version, body):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        return self._store(key, CachedPage(version, body, self.gzip_level, self.brotli_quality))
+
+    def _store(self, key, page):
+        self._entries[key] = page
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return page
+
+    def clear(self):
+        self._entries.clear()
+
+    def respond(self, request, page, media_type="text/html; charset=utf-8"):
+        encoding = preferred_encoding(request.headers.get("accept-encoding", ""), page.bodies)
+        headers = {
+            "ETag": page.etag_for(encoding),
+            "Last-Modified": page.last_modified,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if _not_modified(request, page):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=page.bodies[encoding], media_type=media_type, headers=headers)
@@ -0,0 +1,220 @@
+import base64
+import json
+
+from search import build_match
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+PRACTICE_PAGE_SIZE = 50
+# Up to this many matches, a text or skill filter reads its matches and
+# sorts them; past it, listings walk idx_jobs_posted and test each row
+FEW_MATCHES = 5000
+
+
+JOB_FIELDS = ('id', 'title', 'company', 'location', 'salary', 'salary_min', 'salary_max', 'salary_currency',
+              'type', 'posted_date', 'posted_at', 'description', 'requirements', 'skills')
+# Listings leave out the long text columns unless asked for with ?fields=
+JOB_LIST_FIELDS = tuple(field for field in JOB_FIELDS if field not in ('description', 'requirements'))
+COMPANY_FIELDS = ('id', 'name', 'description', 'logo_url', 'hiring_process', 'syllabus', 'exam_pattern',
+                  'eligibility')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def parse_fields(fields, allowed, default):
+    """Validate a ?fields=a,b,c projection against `allowed` column names."""
+    if not fields:
+        return default
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    unknown = [field for field in requested if field not in allowed]
+    if unknown or not requested:
+        raise InvalidFields(f"Unknown field(s) {', '.join(unknown) or repr(fields)}; "
+                            f"expected any of {', '.join(allowed)}")
+    return requested
+
+
+def columnar(items, fields):
+    # {"title": [...], "company": [...]}: each key once instead of once per row
+    return {field: [item[field] for item in items] for field in fields}
+
+
+def encode_cursor(*keys):
+    # Cursors carry the integer sort keys of the last row served, e.g. (posted_at, id)
+    raw = json.dumps(list(keys), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, size=2):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        keys = json.loads(raw)
+        if not isinstance(keys, list) or len(keys) != size:
+            raise ValueError(token)
+        keys = tuple(int(key) for key in keys)
+        # Beyond int64 the driver raises OverflowError; it is just a bad cursor
+        if not all(-2 ** 63 <= key < 2 ** 63 for key in keys):
+            raise ValueError(token)
+        return keys
+    except (ValueError, TypeError, OverflowError):
+        raise InvalidCursor(f"Invalid cursor: {token!r}")
+
+
+def attach_skills(conn, items):
+    # One lookup for the whole page instead of splitting `requirements`
+    if not items:
+        return items
+    by_id = {item['id']: item for item in items}
+    for item in items:
+        item['skills'] = []
+    placeholders = ', '.join('?' for _ in by_id)
+    for job_id, skill in conn.execute(
+            f"SELECT job_id, skill FROM job_skills WHERE job_id IN ({placeholders}) ORDER BY job_id, position",
+            list(by_id)):
+        by_id[job_id]['skills'].append(skill)
+    return items
+
+
+def _has_few_matches(conn, sql, params):
+    # Counting stops at FEW_MATCHES, so a common term costs no more than a rare one
+    return conn.execute(f"SELECT COUNT(*) FROM ({sql} LIMIT {FEW_MATCHES})", params).fetchone()[0] < FEW_MATCHES
+
+
+def list_jobs(conn, q=None, company=None, location=None, job_type=None,
+              posted_since=None, min_salary=None, max_salary=None, currency=None, skill=None,
+              cursor=None, limit=DEFAULT_PAGE_SIZE, fields=JOB_LIST_FIELDS):
+    """Return one page of jobs, newest first, plus the cursor for the next page.
+
+    Pages are keyed on (posted_at, id) instead of OFFSET, so a deep page
+    costs no more than the first. Equality filters lead into that order
+    through their own indexes. A skill or text query that matches few jobs
+    reads and sorts them; one that matches many walks idx_jobs_posted
+    newest first and stops once the page is full.
+
+    min_salary/max_salary match jobs whose salary range overlaps the given
+    bounds, in whole units of `currency` (amounts are not converted, so pass
+    a currency alongside them). Only `fields` are selected and returned.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    clauses = []
+    params = []
+
+    # Equality filters hit the matching idx_jobs_* index
+    for column, value in (('company', company), ('location', location), ('type', job_type)):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if posted_since is not None:
+        clauses.append("posted_at >= ?")
+        params.append(int(posted_since))
+    if currency:
+        clauses.append("salary_currency = ?")
+        params.append(currency.upper())
+    if min_salary is not None:
+        clauses.append("salary_max >= ?")
+        params.append(int(min_salary))
+    if max_salary is not None:
+        clauses.append("salary_min <= ?")
+        params.append(int(max_salary))
+    if skill:
+        skill = skill.strip()
+        if _has_few_matches(conn, "SELECT 1 FROM job_skills WHERE skill = ?", (skill,)):
+            clauses.append("id IN (SELECT job_id FROM job_skills WHERE skill = ?)")
+        else:
+            # Probed per row on the (job_id, skill) primary key while walking idx_jobs_posted
+            clauses.append("EXISTS (SELECT 1 FROM job_skills WHERE job_id = jobs.id AND skill = ?)")
+        params.append(skill)
+    match = build_match(q)
+    if match:
+        fts_ids = "SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?"
+        # "+id" keeps a common term's matches from driving the query, which
+        # would sort all of them; they become a lookup set for the scan
+        clauses.append(f"{'' if _has_few_matches(conn, fts_ids, (match,)) else '+'}id IN ({fts_ids})")
+        params.append(match)
+    if cursor:
+        clauses.append("(posted_at, id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+
+    # id and posted_at are always read: they key the cursor and the skills lookup
+    columns = dict.fromkeys(('id', 'posted_at') + tuple(field for field in fields if field != 'skills'))
+    sql = f"SELECT {', '.join(columns)} FROM jobs"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    # Fetch one extra row to know whether another page exists
+    sql += " ORDER BY posted_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    rows = conn.execute(sql, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last['posted_at'], last['id'])
+    items = [dict(row) for row in rows[:limit]]
+    if 'skills' in fields:
+        attach_skills(conn, items)
+    if len(columns) + ('skills' in fields) != len(fields):
+        items = [{field: item[field] for field in fields} for item in items]
+    return items, next_cursor
+
+
+def list_companies(conn, fields=COMPANY_FIELDS):
+    return [dict(c) for c in conn.execute(f"SELECT {', '.join(fields)} FROM companies").fetchall()]
+
+
+PRACTICE_TOPICS_SQL = "SELECT topic, difficulty, COUNT(*), MIN(id) FROM practice_problems GROUP BY topic, difficulty"
+
+
+def practice_topics(conn):
+    """Problem counts per topic, overall and by difficulty, in first-seen order.
+
+    A single GROUP BY answered from idx_practice_topic_difficulty; no
+    problem rows are read, so the cost does not grow with the page size.
+    """
+    return fold_practice_topics(conn.execute(PRACTICE_TOPICS_SQL))
+
+
+def fold_practice_topics(rows):
+    # (topic, difficulty, count, first id) groups -> one entry per topic
+    topics = {}
+    for topic, difficulty, count, first_id in rows:
+        entry = topics.setdefault(topic, {'topic': topic, 'total': 0, 'difficulties': {}, 'first_id': first_id})
+        entry['total'] += count
+        if difficulty:
+            entry['difficulties'][difficulty] = count
+        entry['first_id'] = min(entry['first_id'], first_id)
+    ordered = sorted(topics.values(), key=lambda entry: entry['first_id'])
+    for entry in ordered:
+        del entry['first_id']
+    return ordered
+
+
+def list_practice(conn, topic, difficulty=None, cursor=None, limit=PRACTICE_PAGE_SIZE):
+    """Return one page of a topic's problems in id order, plus the next cursor.
+
+    Keyed on id within the topic (idx_practice_topic), like list_jobs.
+    Returns (None, None) when the topic has no problems at all.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    sql = "SELECT id, problem_name, link, difficulty FROM practice_problems WHERE topic = ?"
+    params = [topic]
+    if difficulty:
+        sql += " AND difficulty = ?"
+        params.append(difficulty)
+    if cursor:
+        sql += " AND id > ?"
+        params.extend(decode_cursor(cursor, size=1))
+    sql += " ORDER BY id LIMIT ?"
+    params.append(limit + 1)
+
+    rows = conn.execute(sql, params).fetchall()
+    if not rows and not cursor and conn.execute(
+            "SELECT 1 FROM practice_problems WHERE topic = ? LIMIT 1", (topic,)).fetchone() is None:
+        return None, None
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(items[-1]['id']) if len(rows) > limit else None
+    return items, next_cursor
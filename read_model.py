@@ -0,0 +1,48 @@
+PREP_SUMMARY_FIELDS = ('id', 'category', 'title', 'description')
+
+
+def load_prep(conn):
+    """Read every prep material with roadmap and questions already decoded.
+
+    Steps and questions come from the prep_roadmap_steps / prep_questions
+    tables the write-side triggers maintain, so nothing here parses JSON.
+    Returns (summaries, details): the list projection served by /api/prep,
+    and full records keyed by id for the detail pages.
+    """
+    details = {}
+    for row in conn.execute('SELECT id, category, title, description, notes FROM prep_materials ORDER BY id'):
+        details[row[0]] = {
+            'id': row[0], 'category': row[1], 'title': row[2], 'description': row[3], 'notes': row[4],
+            'roadmap': [], 'questions': [],
+        }
+    for prep_id, step in conn.execute('SELECT prep_id, step FROM prep_roadmap_steps ORDER BY prep_id, position'):
+        if prep_id in details:
+            details[prep_id]['roadmap'].append(step)
+    for prep_id, question, answer in conn.execute(
+            'SELECT prep_id, question, answer FROM prep_questions ORDER BY prep_id, position'):
+        if prep_id in details:
+            details[prep_id]['questions'].append({'q': question, 'a': answer})
+    summaries = [{field: prep[field] for field in PREP_SUMMARY_FIELDS} for prep in details.values()]
+    return summaries, details
+
+
+class PrepReadModel:
+    """Decoded prep materials held in memory for one data version.
+
+    The whole set is small (one row per topic), so it is reloaded in one
+    go whenever the data version moves rather than invalidated per row.
+    Callers must treat the returned dicts as read-only; they are shared.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.summaries = []
+        self.details = {}
+
+    def current(self, version):
+        return self.version == version
+
+    def update(self, version, loaded):
+        self.summaries, self.details = loaded
+        self.version = version
+        return self
@@ -0,0 +1,608 @@
+"""Storage backends behind one async interface.
+
+The app talks to a Repository, never to a driver. LMT_STORAGE picks the
+backend:
+
+  sqlite    (default) the WAL file from datastore.Database, queried on the
+            threadpool through queries.py / search.py / read_model.py
+  postgres  PostgreSQL 14+ through an asyncpg pool (LMT_DATABASE_URL), so
+            any number of app instances can share one database or read
+            from replicas
+
+Both return the same shapes, so handlers and caches are backend-agnostic.
+Load an existing SQLite database into PostgreSQL with:
+
+    python repository.py load-sqlite horizon.db --database-url postgresql://...
+"""
+import abc
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+import ingest
+import metrics
+import queries
+import read_model
+import search
+from database import init_db, needs_init, split_skills
+from datastore import DB_PATH, READ_POOL_SIZE, VERSION_TTL, Database
+
+try:
+    import asyncpg
+except ImportError:  # optional: only needed for LMT_STORAGE=postgres
+    asyncpg = None
+
+STORAGE = os.environ.get("LMT_STORAGE", "sqlite")
+DATABASE_URL = os.environ.get("LMT_DATABASE_URL")
+PG_POOL_MIN = int(os.environ.get("LMT_PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.environ.get("LMT_PG_POOL_MAX", "10"))
+# Prepared statements kept per connection; list_jobs has one SQL variant
+# per combination of filters, all of which fit
+PG_STATEMENT_CACHE_SIZE = 512
+
+
+class Repository(abc.ABC):
+    """Async data access for the app: jobs, prep, companies and practice.
+
+    data_version() is a counter that moves whenever the data may have
+    changed; the page and API caches are keyed on it.
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    async def data_version(self):
+        """The cache key counter described above."""
+
+    @abc.abstractmethod
+    async def list_jobs(self, **filters):
+        """(items, next_cursor): see queries.list_jobs for the filters."""
+
+    @abc.abstractmethod
+    async def search(self, q, scope=None, limit=search.DEFAULT_LIMIT, prefix=True, facets=()):
+        """Ranked hits per scope: see search.search for the result shape."""
+
+    @abc.abstractmethod
+    async def load_prep(self):
+        """(summaries, details): see read_model.load_prep."""
+
+    @abc.abstractmethod
+    async def list_companies(self, fields=queries.COMPANY_FIELDS):
+        """Every company, in id order, with only `fields`."""
+
+    @abc.abstractmethod
+    async def practice_topics(self):
+        """See queries.practice_topics."""
+
+    @abc.abstractmethod
+    async def list_practice(self, topic, difficulty=None, cursor=None, limit=queries.PRACTICE_PAGE_SIZE):
+        """(items, next_cursor), or (None, None) for an unknown topic."""
+
+    @abc.abstractmethod
+    async def ingest(self, stream, fmt, batch_size=ingest.BATCH_SIZE):
+        """Upsert a JSONL/CSV job feed; returns the ingest report."""
+
+    async def close(self):
+        pass
+
+
+class SQLiteRepository(Repository):
+    """The embedded backend: queries.py functions run on datastore's pools."""
+
+    name = "sqlite"
+
+    def __init__(self, path=DB_PATH, readers=READ_POOL_SIZE, factory=None):
+        # Pooled connections time their statements unless metrics are off
+        self.db = Database(path, readers, factory=factory or metrics.connection_factory())
+        self.db.initialize(init_db, needs_init)
+
+    async def data_version(self):
+        return self.db.data_version()
+
+    async def list_jobs(self, **filters):
+        return await self.db.read(queries.list_jobs, **filters)
+
+    async def search(self, q, scope=None, limit=search.DEFAULT_LIMIT, prefix=True, facets=()):
+        return await self.db.read(search.search, q, scope=scope, limit=limit, prefix=prefix, facets=facets)
+
+    async def load_prep(self):
+        return await self.db.read(read_model.load_prep)
+
+    async def list_companies(self, fields=queries.COMPANY_FIELDS):
+        return await self.db.read(queries.list_companies, fields)
+
+    async def practice_topics(self):
+        return await self.db.read(queries.practice_topics)
+
+    async def list_practice(self, topic, difficulty=None, cursor=None, limit=queries.PRACTICE_PAGE_SIZE):
+        return await self.db.read(queries.list_practice, topic, difficulty=difficulty, cursor=cursor, limit=limit)
+
+    async def ingest(self, stream, fmt, batch_size=ingest.BATCH_SIZE):
+        return await self.db.write(ingest.ingest_stream, stream, fmt, batch_size)
+
+    async def close(self):
+        self.db.close()
+
+
+POSTGRES_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    location TEXT NOT NULL,
+    salary TEXT,
+    salary_min BIGINT,
+    salary_max BIGINT,
+    salary_currency TEXT,
+    type TEXT NOT NULL,
+    posted_date TEXT NOT NULL,
+    posted_at BIGINT NOT NULL DEFAULT 0,
+    description TEXT,
+    requirements TEXT,
+    -- Weights mirror the bm25() column weights in search.py
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(company, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(requirements, '')), 'C')
+    ) STORED,
+    UNIQUE (company, title, location)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_posted ON jobs (posted_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company, posted_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs (location, posted_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_type ON jobs (type, posted_at DESC, id DESC);
+-- Salary filters use the typed range; the display string is not indexed
+DROP INDEX IF EXISTS idx_jobs_salary;
+CREATE INDEX IF NOT EXISTS idx_jobs_salary_range ON jobs (salary_currency, salary_max, salary_min);
+CREATE INDEX IF NOT EXISTS idx_jobs_search ON jobs USING GIN (search_vector);
+
+CREATE TABLE IF NOT EXISTS job_skills (
+    job_id BIGINT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    skill TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (job_id, skill)
+);
+-- Skills match case-insensitively, like COLLATE NOCASE on SQLite
+CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills (lower(skill), job_id);
+
+CREATE TABLE IF NOT EXISTS prep_materials (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    category TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    roadmap TEXT,
+    notes TEXT,
+    questions TEXT,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(questions, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(notes, '')), 'D')
+    ) STORED
+);
+CREATE INDEX IF NOT EXISTS idx_prep_search ON prep_materials USING GIN (search_vector);
+
+CREATE TABLE IF NOT EXISTS companies (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    logo_url TEXT,
+    hiring_process TEXT,
+    syllabus TEXT,
+    exam_pattern TEXT,
+    eligibility TEXT
+);
+
+CREATE TABLE IF NOT EXISTS practice_problems (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    topic TEXT NOT NULL,
+    problem_name TEXT NOT NULL,
+    link TEXT,
+    difficulty TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_practice_topic ON practice_problems (topic, id);
+CREATE INDEX IF NOT EXISTS idx_practice_topic_difficulty ON practice_problems (topic, difficulty, id);
+
+-- One row, bumped by every writing statement on any table: every app
+-- instance polls it to invalidate its caches (data_version())
+CREATE TABLE IF NOT EXISTS lmt_data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO lmt_data_version (id, version) VALUES (TRUE, 0) ON CONFLICT DO NOTHING;
+CREATE OR REPLACE FUNCTION lmt_bump_data_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE lmt_data_version SET version = version + 1;
+    RETURN NULL;
+END
+$$;
+'''
+
+DATA_TABLES = ('jobs', 'job_skills', 'prep_materials', 'companies', 'practice_problems')
+
+# Columns copied by load_sqlite(), in dependency order
+COPY_COLUMNS = {
+    'jobs': ('id', 'title', 'company', 'location', 'salary', 'salary_min', 'salary_max', 'salary_currency',
+             'type', 'posted_date', 'posted_at', 'description', 'requirements'),
+    'job_skills': ('job_id', 'skill', 'position'),
+    'prep_materials': ('id', 'category', 'title', 'description', 'roadmap', 'notes', 'questions'),
+    'companies': queries.COMPANY_FIELDS,
+    'practice_problems': ('id', 'topic', 'problem_name', 'link', 'difficulty'),
+}
+
+_PG_JOB_COLUMNS = COPY_COLUMNS['jobs'][1:]
+_PG_UPSERT_SQL = f'''
+INSERT INTO jobs ({', '.join(_PG_JOB_COLUMNS)})
+SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::bigint[], $6::bigint[], $7::text[],
+                     $8::text[], $9::text[], $10::bigint[], $11::text[], $12::text[])
+ON CONFLICT (company, title, location) DO UPDATE SET
+    {', '.join(f'{column} = excluded.{column}' for column in _PG_JOB_COLUMNS[3:])}
+RETURNING id, requirements
+'''
+
+# ts_rank_cd is "higher is better"; it is negated so scores sort like bm25().
+# As on SQLite only the newest search.RANK_CANDIDATES hits are scored
+_PG_SEARCH_SQL = {
+    'jobs': '''
+        SELECT id, title, company, location, type, salary, posted_date,
+               ts_headline('simple', concat_ws(' … ', title, company, requirements), query,
+                           'StartSel=<mark>, StopSel=</mark>, MaxWords=12, MinWords=4') AS snippet,
+               score
+        FROM (
+            SELECT *, -ts_rank_cd(search_vector, query) AS score
+            FROM (
+                SELECT j.id, j.title, j.company, j.location, j.type, j.salary, j.posted_date, j.requirements,
+                       j.search_vector, q.query
+                FROM jobs j, to_tsquery('simple', $1) AS q(query)
+                WHERE j.search_vector @@ q.query
+                ORDER BY j.id DESC
+                LIMIT $3
+            ) candidates
+            ORDER BY score, id
+            LIMIT $2
+        ) hits
+        ORDER BY score, id
+    ''',
+    'prep': '''
+        SELECT id, category, title, description,
+               ts_headline('simple', concat_ws(' … ', title, description, notes), query,
+                           'StartSel=<mark>, StopSel=</mark>, MaxWords=12, MinWords=4') AS snippet,
+               score
+        FROM (
+            SELECT *, -ts_rank_cd(search_vector, query) AS score
+            FROM (
+                SELECT p.id, p.category, p.title, p.description, p.notes, p.search_vector, q.query
+                FROM prep_materials p, to_tsquery('simple', $1) AS q(query)
+                WHERE p.search_vector @@ q.query
+                ORDER BY p.id DESC
+                LIMIT $3
+            ) candidates
+            ORDER BY score, id
+            LIMIT $2
+        ) hits
+        ORDER BY score, id
+    ''',
+}
+_PG_SEARCH_TABLES = {'jobs': 'jobs', 'prep': 'prep_materials'}
+
+
+def build_tsquery(q, prefix=True):
+    """Free text -> to_tsquery() input, the tsvector twin of search.build_match.
+
+    Tokens are \\w+ runs, so nothing the user types is parsed as tsquery
+    syntax; with prefix=True the last token matches as a prefix.
+    """
+    terms = [f"'{token.lower()}'" for token in search.tokenize(q)]
+    if not terms:
+        return None
+    if prefix:
+        terms[-1] += ':*'
+    return ' & '.join(terms)
+
+
+def _decode_list(text):
+    try:
+        value = json.loads(text) if text else []
+    except ValueError:
+        return []
+    return value if isinstance(value, list) else []
+
+
+class PostgresRepository(Repository):
+    """PostgreSQL backend over an asyncpg connection pool.
+
+    The pool and schema are set up on first use. Queries go through
+    asyncpg's per-connection prepared statement cache, so each distinct
+    SQL text is parsed and planned once per connection. Search uses
+    generated tsvector columns with GIN indexes in place of FTS5.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn=DATABASE_URL, min_size=PG_POOL_MIN, max_size=PG_POOL_MAX):
+        if asyncpg is None:
+            raise RuntimeError("LMT_STORAGE=postgres needs asyncpg: pip install asyncpg")
+        if not dsn:
+            raise RuntimeError("LMT_STORAGE=postgres needs LMT_DATABASE_URL")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+        self._version = None
+        self._checked_at = float("-inf")
+
+    async def pool(self):
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size,
+                                                     statement_cache_size=PG_STATEMENT_CACHE_SIZE)
+                    async with pool.acquire() as conn:
+                        await self._create_schema(conn)
+                    self._pool = pool
+        return self._pool
+
+    async def _create_schema(self, conn):
+        async with conn.transaction():
+            # Serialize instances starting at once; the DDL itself is idempotent
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext('lmt_schema'))")
+            await conn.execute(POSTGRES_SCHEMA)
+            for table in DATA_TABLES:
+                await conn.execute(f'''
+                    CREATE OR REPLACE TRIGGER {table}_data_version
+                    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                    FOR EACH STATEMENT EXECUTE FUNCTION lmt_bump_data_version()
+                ''')
+
+    async def _fetch(self, sql, *args, conn=None):
+        started = time.perf_counter()
+        try:
+            if conn is not None:
+                return await conn.fetch(sql, *args)
+            return await (await self.pool()).fetch(sql, *args)
+        finally:
+            if metrics.ENABLED:
+                metrics.observe_statement(sql, time.perf_counter() - started)
+
+    async def data_version(self):
+        # Polled at most once per VERSION_TTL, like datastore.Database
+        now = time.monotonic()
+        if now - self._checked_at >= VERSION_TTL:
+            rows = await self._fetch("SELECT version FROM lmt_data_version")
+            self._version = rows[0]['version']
+            self._checked_at = now
+        return self._version
+
+    async def list_jobs(self, q=None, company=None, location=None, job_type=None,
+                        posted_since=None, min_salary=None, max_salary=None, currency=None, skill=None,
+                        cursor=None, limit=queries.DEFAULT_PAGE_SIZE, fields=queries.JOB_LIST_FIELDS):
+        limit = max(1, min(int(limit), queries.MAX_PAGE_SIZE))
+        clauses = []
+        params = []
+
+        def param(value):
+            params.append(value)
+            return f"${len(params)}"
+
+        for column, value in (('company', company), ('location', location), ('type', job_type)):
+            if value:
+                clauses.append(f"{column} = {param(value)}")
+        if posted_since is not None:
+            clauses.append(f"posted_at >= {param(int(posted_since))}")
+        if currency:
+            clauses.append(f"salary_currency = {param(currency.upper())}")
+        if min_salary is not None:
+            clauses.append(f"salary_max >= {param(int(min_salary))}")
+        if max_salary is not None:
+            clauses.append(f"salary_min <= {param(int(max_salary))}")
+        if skill:
+            clauses.append(f"id IN (SELECT job_id FROM job_skills WHERE lower(skill) = lower({param(skill.strip())}))")
+        tsquery = build_tsquery(q)
+        if tsquery:
+            clauses.append(f"search_vector @@ to_tsquery('simple', {param(tsquery)})")
+        if cursor:
+            posted_at, job_id = queries.decode_cursor(cursor)
+            clauses.append(f"(posted_at, id) < ({param(posted_at)}, {param(job_id)})")
+
+        columns = dict.fromkeys(('id', 'posted_at') + tuple(field for field in fields if field != 'skills'))
+        sql = f"SELECT {', '.join(columns)} FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY posted_at DESC, id DESC LIMIT {param(limit + 1)}"
+
+        rows = await self._fetch(sql, *params)
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = queries.encode_cursor(last['posted_at'], last['id'])
+        items = [dict(row) for row in rows[:limit]]
+        if 'skills' in fields:
+            await self._attach_skills(items)
+        if len(columns) + ('skills' in fields) != len(fields):
+            items = [{field: item[field] for field in fields} for item in items]
+        return items, next_cursor
+
+    async def _attach_skills(self, items):
+        by_id = {item['id']: item for item in items}
+        for item in items:
+            item['skills'] = []
+        if not by_id:
+            return
+        for row in await self._fetch(
+                "SELECT job_id, skill FROM job_skills WHERE job_id = ANY($1::bigint[]) ORDER BY job_id, position",
+                list(by_id)):
+            by_id[row['job_id']]['skills'].append(row['skill'])
+
+    async def search(self, q, scope=None, limit=search.DEFAULT_LIMIT, prefix=True, facets=()):
+        limit = max(1, min(int(limit), search.MAX_LIMIT))
+        scopes = search.SCOPES if scope in (None, '', 'all') else (scope,)
+        tsquery = build_tsquery(q, prefix=prefix)
+
+        results = {}
+        for name in scopes:
+            if tsquery is None:
+                results[name] = {'total': 0, 'total_capped': False, 'items': [], 'facets': {}}
+                continue
+            table = _PG_SEARCH_TABLES[name]
+            rows = await self._fetch(_PG_SEARCH_SQL[name], tsquery, limit, search.RANK_CANDIDATES)
+            # Hits are counted up to search.COUNT_CAP, like search._count/_facet
+            hits = (f"SELECT {', '.join(search.FACETS[name])} FROM {table} "
+                    f"WHERE search_vector @@ to_tsquery('simple', $1) LIMIT $2")
+            total = (await self._fetch(f"SELECT COUNT(*) AS count FROM ({hits}) hits",
+                                       tsquery, search.COUNT_CAP))[0]['count']
+            facet_counts = {}
+            for column in search.FACETS[name]:
+                if column in facets:
+                    facet_rows = await self._fetch(f'''
+                        SELECT {column} AS value, COUNT(*) AS count FROM ({hits}) hits
+                        GROUP BY {column}
+                        ORDER BY count DESC, value
+                    ''', tsquery, search.COUNT_CAP)
+                    facet_counts[column] = {row['value']: row['count'] for row in facet_rows}
+            results[name] = {'total': total, 'total_capped': total >= search.COUNT_CAP,
+                             'items': [dict(row) for row in rows], 'facets': facet_counts}
+        return {'query': q, 'match': tsquery, 'results': results}
+
+    async def load_prep(self):
+        # Decoded once per data version (read_model.PrepReadModel), not per request
+        details = {}
+        for row in await self._fetch(
+                "SELECT id, category, title, description, notes, roadmap, questions FROM prep_materials ORDER BY id"):
+            questions = [{'q': item.get('q'), 'a': item.get('a')} for item in _decode_list(row['questions'])
+                         if isinstance(item, dict) and item.get('q') is not None]
+            details[row['id']] = {
+                'id': row['id'], 'category': row['category'], 'title': row['title'],
+                'description': row['description'], 'notes': row['notes'],
+                'roadmap': [step for step in _decode_list(row['roadmap']) if step is not None],
+                'questions': questions,
+            }
+        summaries = [{field: prep[field] for field in read_model.PREP_SUMMARY_FIELDS} for prep in details.values()]
+        return summaries, details
+
+    async def list_companies(self, fields=queries.COMPANY_FIELDS):
+        return [dict(row) for row in await self._fetch(f"SELECT {', '.join(fields)} FROM companies ORDER BY id")]
+
+    async def practice_topics(self):
+        return queries.fold_practice_topics(
+            tuple(row) for row in await self._fetch(queries.PRACTICE_TOPICS_SQL))
+
+    async def list_practice(self, topic, difficulty=None, cursor=None, limit=queries.PRACTICE_PAGE_SIZE):
+        limit = max(1, min(int(limit), queries.MAX_PAGE_SIZE))
+        sql = "SELECT id, problem_name, link, difficulty FROM practice_problems WHERE topic = $1"
+        params = [topic]
+        if difficulty:
+            params.append(difficulty)
+            sql += f" AND difficulty = ${len(params)}"
+        if cursor:
+            params.extend(queries.decode_cursor(cursor, size=1))
+            sql += f" AND id > ${len(params)}"
+        params.append(limit + 1)
+        sql += f" ORDER BY id LIMIT ${len(params)}"
+
+        rows = await self._fetch(sql, *params)
+        if not rows and not cursor and not await self._fetch(
+                "SELECT 1 FROM practice_problems WHERE topic = $1 LIMIT 1", topic):
+            return None, None
+        items = [dict(row) for row in rows[:limit]]
+        next_cursor = queries.encode_cursor(items[-1]['id']) if len(rows) > limit else None
+        return items, next_cursor
+
+    async def ingest(self, stream, fmt, batch_size=ingest.BATCH_SIZE):
+        """Upsert a feed with one unnest() statement per batch.
+
+        Parsing runs on the threadpool. Within a batch the last record for a
+        (company, title, location) wins, as it does on SQLite.
+        """
+        started = time.perf_counter()
+        report = ingest.new_report()
+        batches = ingest.normalized_batches(stream, fmt, batch_size, report)
+        pool = await self.pool()
+        while True:
+            batch = await run_in_threadpool(next, batches, None)
+            if batch is None:
+                break
+            rows = list({(row[1], row[0], row[2]): row for row in batch}.values())
+            async with pool.acquire() as conn, conn.transaction():
+                upserted = await self._fetch(_PG_UPSERT_SQL, *map(list, zip(*rows)), conn=conn)
+                job_ids = [row['id'] for row in upserted]
+                await conn.execute("DELETE FROM job_skills WHERE job_id = ANY($1::bigint[])", job_ids)
+                skills = [(row['id'], skill, position) for row in upserted
+                          for position, skill in enumerate(split_skills(row['requirements']))]
+                if skills:
+                    await conn.copy_records_to_table('job_skills', records=skills,
+                                                     columns=COPY_COLUMNS['job_skills'])
+            report['upserted'] += len(batch)
+            report['batches'] += 1
+        return ingest.finish_report(report, started)
+
+    async def load_sqlite(self, path, batch_size=50_000):
+        """Replace this database's contents with a SQLite database's (COPY)."""
+        source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        counts = {}
+        try:
+            pool = await self.pool()
+            async with pool.acquire() as conn, conn.transaction():
+                await conn.execute(f"TRUNCATE {', '.join(DATA_TABLES)} RESTART IDENTITY")
+                for table, columns in COPY_COLUMNS.items():
+                    cursor = source.execute(f"SELECT {', '.join(columns)} FROM {table}")
+                    counts[table] = 0
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        await conn.copy_records_to_table(table, records=rows, columns=columns)
+                        counts[table] += len(rows)
+                    if columns[0] == 'id':
+                        # Explicit ids were copied; move the identity past them
+                        await conn.execute(f'''
+                            SELECT setval(pg_get_serial_sequence('{table}', 'id'),
+                                          COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)
+                        ''')
+                await conn.execute(f"ANALYZE {', '.join(DATA_TABLES)}")
+        finally:
+            source.close()
+        return counts
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def create_repository(storage=STORAGE, **options):
+    """The Repository selected by LMT_STORAGE ("sqlite" or "postgres")."""
+    if storage == "sqlite":
+        return SQLiteRepository(**options)
+    if storage == "postgres":
+        return PostgresRepository(**options)
+    raise ValueError(f"Unknown LMT_STORAGE {storage!r}; expected sqlite or postgres")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("load-sqlite", help="copy a SQLite database into PostgreSQL")
+    load.add_argument("path", nargs="?", default=DB_PATH, help="SQLite database (default: LMT_DB_PATH or horizon.db)")
+    load.add_argument("--database-url", default=DATABASE_URL, help="default: LMT_DATABASE_URL")
+    args = parser.parse_args()
+
+    async def run():
+        repo = PostgresRepository(args.database_url)
+        try:
+            return await repo.load_sqlite(args.path)
+        finally:
+            await repo.close()
+
+    started = time.perf_counter()
+    counts = asyncio.run(run())
+    print(f"loaded {counts} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
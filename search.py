@@ -0,0 +1,135 @@
+import re
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+SCOPES = ('jobs', 'prep')
+# Facet columns a client may ask for with ?facets=, per scope
+FACETS = {'jobs': ('company', 'type'), 'prep': ('category',)}
+FACET_NAMES = tuple(dict.fromkeys(name for names in FACETS.values() for name in names))
+# Totals and facet counts stop here: an exact count of a common term would
+# touch every matching row on every keystroke
+COUNT_CAP = 1000
+# Hits scored per query; see _ranked()
+RANK_CANDIDATES = 2000
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+# Column weights for bm25(): a hit in the title outranks one in the body
+_JOBS_WEIGHTS = (10.0, 5.0, 1.0)        # title, company, requirements
+_PREP_WEIGHTS = (10.0, 4.0, 1.0, 2.0)   # title, description, notes, questions
+
+
+def tokenize(q):
+    return _TOKEN.findall(q or '')
+
+
+def build_match(q, prefix=True):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every token is quoted so user input can never inject FTS5 syntax. With
+    prefix=True the last token becomes a prefix query for type-ahead.
+    """
+    tokens = tokenize(q)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    if prefix:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _ranked(fts_table, table, columns):
+    """SQL for the top hits: ?1 match, ?2 rank function, ?3 candidates, ?4 limit.
+
+    BM25 is computed for at most RANK_CANDIDATES hits, the newest by
+    rowid, so a term that matches most of the table costs the same as a
+    rare one. Snippets are made for the returned rows only: the outer
+    MATCH is confined to the rowid range of the winners instead of being
+    re-run once per row.
+    """
+    return f'''
+        WITH best AS (
+            SELECT rowid, score FROM (
+                SELECT rowid, rank AS score FROM {fts_table}
+                WHERE {fts_table} MATCH ?1 AND rank MATCH ?2
+                ORDER BY rowid DESC
+                LIMIT ?3
+            )
+            ORDER BY score
+            LIMIT ?4
+        )
+        SELECT {', '.join(f't.{column}' for column in columns)},
+               snippet({fts_table}, -1, '<mark>', '</mark>', '…', 12) AS snippet,
+               best.score
+        FROM {fts_table}
+        CROSS JOIN best ON best.rowid = {fts_table}.rowid
+        JOIN {table} t ON t.id = best.rowid
+        WHERE {fts_table} MATCH ?1
+          AND {fts_table}.rowid BETWEEN (SELECT MIN(rowid) FROM best) AND (SELECT MAX(rowid) FROM best)
+        ORDER BY best.score, t.id
+    '''
+
+
+def _rank(weights):
+    # Per-query FTS5 rank function, so the weights live here and not in the schema
+    return f"bm25({', '.join(str(w) for w in weights)})"
+
+
+# scope -> (FTS table, content table, top hits SQL, bm25 weights)
+_SCOPE_TABLES = {
+    'jobs': ('jobs_fts', 'jobs',
+             _ranked('jobs_fts', 'jobs', ('id', 'title', 'company', 'location', 'type', 'salary', 'posted_date')),
+             _JOBS_WEIGHTS),
+    'prep': ('prep_fts', 'prep_materials',
+             _ranked('prep_fts', 'prep_materials', ('id', 'category', 'title', 'description')),
+             _PREP_WEIGHTS),
+}
+
+
+def _count(conn, fts_table, match):
+    # Counting stops at COUNT_CAP hits; "total_capped" tells the client
+    return conn.execute(f'''
+        SELECT COUNT(*) FROM (SELECT 1 FROM {fts_table} WHERE {fts_table} MATCH ? LIMIT ?)
+    ''', (match, COUNT_CAP)).fetchone()[0]
+
+
+def _facet(conn, fts_table, table, column, match):
+    # Counted over the first COUNT_CAP hits only, like the total
+    rows = conn.execute(f'''
+        SELECT t.{column} AS value, COUNT(*) AS count
+        FROM (SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ? LIMIT ?) hits
+        JOIN {table} t ON t.id = hits.rowid
+        GROUP BY t.{column}
+        ORDER BY count DESC, value
+    ''', (match, COUNT_CAP)).fetchall()
+    return {row['value']: row['count'] for row in rows}
+
+
+def search(conn, q, scope=None, limit=DEFAULT_LIMIT, prefix=True, facets=()):
+    """Ranked full-text search over jobs and prep materials.
+
+    Returns one block per table with its BM25-ordered hits (lower score is a
+    better match; only the newest RANK_CANDIDATES hits are scored),
+    highlighted snippets and the hit count, capped at COUNT_CAP. Facet
+    counts are only computed for the FACETS columns named in `facets`.
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    scopes = SCOPES if scope in (None, '', 'all') else (scope,)
+    match = build_match(q, prefix=prefix)
+
+    results = {}
+    for name in scopes:
+        if match is None:
+            results[name] = {'total': 0, 'total_capped': False, 'items': [], 'facets': {}}
+            continue
+        fts_table, table, sql, weights = _SCOPE_TABLES[name]
+        rows = conn.execute(sql, (match, _rank(weights), RANK_CANDIDATES, limit)).fetchall()
+        total = _count(conn, fts_table, match)
+        results[name] = {
+            'total': total,
+            'total_capped': total >= COUNT_CAP,
+            'items': [dict(row) for row in rows],
+            'facets': {column: _facet(conn, fts_table, table, column, match)
+                       for column in FACETS[name] if column in facets},
+        }
+    return {'query': q, 'match': match, 'results': results}
@@ -1,3 +1,6 @@
+// Set to true by build_static.py for the flat docs/ site, which has no API
+const STATIC_SITE = false;
+
 // Theme Toggle Logic
 const htmlElement = document.documentElement;
 
@@ -29,6 +32,7 @@ document.addEventListener('DOMContentLoaded', () => {
     fetchJobs();
     fetchPrep();
     initModal();
+    initFilters();
 
     // Setup theme toggle button if it exists
     const themeToggle = document.getElementById('themeToggle');
@@ -93,48 +97,236 @@ function handleLoginSuccess(userName) {
 }
 
 let allJobs = [];
+let nextJobsCursor = null;
+let activeFilter = {};
+
+async function fetchJobs(append = false) {
+    const query = document.getElementById('job-search').value.trim();
 
-async function fetchJobs() {
     try {
-        const response = await fetch('/api/jobs');
-        const jobs = await response.json();
-        allJobs = jobs;
-        renderJobs(jobs);
+        let data;
+        if (STATIC_SITE) {
+            data = await fetchStaticJobs(append, query);
+        } else {
+            const params = new URLSearchParams(activeFilter);
+            if (query) params.set('q', query);
+            if (append && nextJobsCursor) params.set('cursor', nextJobsCursor);
+            const response = await fetch(`/api/jobs?${params}`);
+            data = await response.json();
+        }
+
+        allJobs = append ? allJobs.concat(data.items) : data.items;
+        nextJobsCursor = data.next_cursor;
+        renderJobs(data.items, append);
+        updateLoadMore();
     } catch (error) {
         console.error('Error fetching jobs:', error);
     }
 }
 
-async function fetchPrep() {
+function updateLoadMore() {
+    const button = document.getElementById('load-more-jobs');
+    if (button) {
+        button.style.display = nextJobsCursor ? 'inline-block' : 'none';
+    }
+}
+
+function initFilters() {
+    document.querySelectorAll('.filters .btn-outline').forEach(button => {
+        button.addEventListener('click', () => {
+            document.querySelectorAll('.filters .btn-outline').forEach(b => b.classList.remove('active'));
+            button.classList.add('active');
+            activeFilter = button.dataset.field ? { [button.dataset.field]: button.dataset.value } : {};
+            searchJobs();
+        });
+    });
+}
+
+// Static site: data comes from content-hashed shards listed in an index
+// manifest. Shards are fetched lazily, and per-shard facets and lookups let
+// a filter skip every shard that cannot contain a match.
+const staticIndexes = {};
+const staticShards = new Map();
+let pendingJobShards = [];
+
+async function loadStaticIndex(name) {
+    if (!staticIndexes[name]) {
+        staticIndexes[name] = fetch(`data/${name}-index.json`).then(r => r.json());
+    }
+    return staticIndexes[name];
+}
+
+function loadStaticShard(file) {
+    if (!staticShards.has(file)) {
+        staticShards.set(file, fetch(`data/${file}`).then(r => r.json()));
+    }
+    return staticShards.get(file);
+}
+
+function matchesFilter(job) {
+    return Object.entries(activeFilter).every(([field, value]) => job[field] === value);
+}
+
+// Shards that can hold a row matching activeFilter. Low-cardinality
+// columns are checked against each shard's facet counts; the others have a
+// lookup file (value -> base64 bitset of shards), fetched on first use.
+async function shardsMatchingFilter(index) {
+    const checks = await Promise.all(Object.entries(activeFilter).map(async ([field, value]) => {
+        const lookup = (index.lookups || {})[field];
+        if (!lookup) return (shard) => (shard.facets[field] || {})[value];
+        const bits = atob((await loadStaticShard(lookup))[value] || '');
+        return (shard, ordinal) => (bits.charCodeAt(ordinal >> 3) >> (ordinal & 7)) & 1;
+    }));
+    return index.shards.filter((shard, ordinal) => checks.every(check => check(shard, ordinal)));
+}
+
+// Split text the way SQLite's unicode61 tokenizer does (lowercase, no
+// diacritics, runs of letters/digits) so queries line up with index terms
+function tokenize(text) {
+    return text.toLowerCase().normalize('NFD').replace(/[\u0300-\u036f]/g, '')
+        .split(/[^\p{L}\p{N}]+/u).filter(Boolean);
+}
+
+function lowerBound(terms, token) {
+    let lo = 0, hi = terms.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (terms[mid] < token) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+}
+
+async function lookupTerm(index, token, prefix) {
+    // A prefix shorter than the bucket key ("d") spans every bucket it starts
+    const keys = prefix && token.length < index.bucket_chars
+        ? Object.keys(index.buckets).filter(key => key.startsWith(token))
+        : [token.slice(0, index.bucket_chars)];
+    const buckets = await Promise.all(keys.filter(key => index.buckets[key])
+        .map(key => loadStaticShard(index.buckets[key])));
+    const matches = new Set();
+    for (const bucket of buckets) {
+        for (let i = lowerBound(bucket.terms, token); i < bucket.terms.length; i++) {
+            const term = bucket.terms[i];
+            if (term !== token && !(prefix && term.startsWith(token))) break;
+            let ordinal = 0;
+            for (const delta of bucket.postings[i]) {
+                ordinal += delta;
+                matches.add(ordinal);
+            }
+        }
+    }
+    return matches;
+}
+
+// Query the prebuilt inverted index: every token must match, the last one
+// as a prefix for type-ahead. Returns matching row ordinals in export order.
+async function searchStaticIndex(name, query) {
+    const tokens = tokenize(query);
+    const index = await loadStaticIndex(`search-${name}`);
+    const sets = await Promise.all(tokens.map((token, i) => lookupTerm(index, token, i === tokens.length - 1)));
+    sets.sort((a, b) => a.size - b.size);
+    const [smallest = new Set(), ...rest] = sets;
+    return [...smallest].filter(ordinal => rest.every(set => set.has(ordinal))).sort((a, b) => a - b);
+}
+
+async function rowsAt(index, ordinals) {
+    return Promise.all(ordinals.map(async ordinal => {
+        const rows = await loadStaticShard(index.shards[Math.floor(ordinal / index.shard_size)].file);
+        return rows[ordinal % index.shard_size];
+    }));
+}
+
+const STATIC_PAGE_SIZE = 20;
+let staticMatches = null;
+
+async function fetchStaticJobs(append, query) {
+    const index = await loadStaticIndex('jobs');
+    if (!append) {
+        pendingJobShards = await shardsMatchingFilter(index);
+        staticMatches = query ? await searchStaticIndex('jobs', query) : null;
+    }
+
+    if (staticMatches) {
+        // Search: resolve the next page of hits, fetching only their shards
+        const items = [];
+        while (staticMatches.length && items.length < STATIC_PAGE_SIZE) {
+            const page = staticMatches.splice(0, STATIC_PAGE_SIZE - items.length);
+            items.push(...(await rowsAt(index, page)).filter(matchesFilter));
+        }
+        return { items, next_cursor: staticMatches.length ? 'next-match' : null };
+    }
+
+    const shard = pendingJobShards.shift();
+    const rows = shard ? await loadStaticShard(shard.file) : [];
+    return { items: rows.filter(matchesFilter), next_cursor: pendingJobShards.length ? 'next-shard' : null };
+}
+
+async function fetchPrep(query = '') {
     try {
-        const response = await fetch('/api/prep');
-        const prep = await response.json();
+        let prep;
+        if (STATIC_SITE) {
+            const index = await loadStaticIndex('prep');
+            if (query) {
+                prep = await rowsAt(index, await searchStaticIndex('prep', query));
+            } else {
+                const shards = await Promise.all(index.shards.map(shard => loadStaticShard(shard.file)));
+                prep = shards.flat();
+            }
+        } else if (query) {
+            const params = new URLSearchParams({ q: query, scope: 'prep', limit: 50 });
+            const response = await fetch(`/api/search?${params}`);
+            prep = (await response.json()).results.prep.items;
+        } else {
+            const response = await fetch('/api/prep');
+            prep = await response.json();
+        }
         renderPrep(prep);
     } catch (error) {
         console.error('Error fetching prep materials:', error);
     }
 }
 
-function renderJobs(jobs) {
+function escapeHtml(value) {
+    const div = document.createElement('div');
+    div.textContent = value == null ? '' : value;
+    return div.innerHTML;
+}
+
+function formatPosted(job) {
+    if (!job.posted_at) return job.posted_date;
+    const minutes = Math.max(0, Math.floor((Date.now() / 1000 - job.posted_at) / 60));
+    if (minutes < 60) return minutes <= 1 ? 'Just now' : `${minutes} minutes ago`;
+    const hours = Math.floor(minutes / 60);
+    if (hours < 24) return hours === 1 ? '1 hour ago' : `${hours} hours ago`;
+    const days = Math.floor(hours / 24);
+    if (days < 7) return days === 1 ? '1 day ago' : `${days} days ago`;
+    if (days < 30) return Math.floor(days / 7) === 1 ? '1 week ago' : `${Math.floor(days / 7)} weeks ago`;
+    return new Date(job.posted_at * 1000).toLocaleDateString();
+}
+
+function renderJobs(jobs, append = false) {
     const container = document.getElementById('jobs-container');
-    container.innerHTML = '';
+    if (!append) {
+        container.innerHTML = '';
+    }
 
     jobs.forEach((job, index) => {
         const card = document.createElement('div');
         card.className = 'job-card';
         card.style.animationDelay = `${index * 0.1}s`;
 
+        // Every field comes from ingested feeds, so all of it is escaped
         card.innerHTML = `
-            <div class="company">${job.company}</div>
-            <h3>${job.title}</h3>
+            <div class="company">${escapeHtml(job.company)}</div>
+            <h3>${escapeHtml(job.title)}</h3>
             <div class="job-details">
-                <span><i class="fas fa-map-marker-alt"></i> ${job.location}</span>
-                <span><i class="fas fa-briefcase"></i> ${job.type}</span>
+                <span><i class="fas fa-map-marker-alt"></i> ${escapeHtml(job.location)}</span>
+                <span><i class="fas fa-briefcase"></i> ${escapeHtml(job.type)}</span>
             </div>
-            <p style="font-size: 0.85rem; color: #94a3b8; margin-bottom: 1rem;">${job.requirements.split(',').slice(0, 3).join(' • ')}</p>
+            <p style="font-size: 0.85rem; color: #94a3b8; margin-bottom: 1rem;">${escapeHtml((job.skills || []).slice(0, 3).join(' • '))}</p>
             <div class="job-footer">
-                <span class="salary">${job.salary}</span>
-                <span class="posted">${job.posted_date}</span>
+                <span class="salary">${escapeHtml(job.salary)}</span>
+                <span class="posted">${escapeHtml(formatPosted(job))}</span>
             </div>
         `;
 
@@ -163,18 +355,20 @@ function renderPrep(materials) {
         card.style.cursor = 'pointer';
 
         const icon = icons[item.category] || 'fa-book';
+        const href = `/prep/${item.id}`;
 
+        // Prep content is stored data like job feeds, so it is escaped the same way
         card.innerHTML = `
             <span class="prep-icon"><i class="fas ${icon}"></i></span>
-            <div style="font-size: 0.7rem; color: var(--accent-color); font-weight: 800; text-transform: uppercase; margin-bottom: 0.5rem;">${item.category}</div>
-            <h4>${item.title}</h4>
-            <p>${item.description}</p>
-            <a href="/prep/${item.id}" class="btn-outline" style="text-decoration: none; display: inline-block; margin-top: 1rem;">Start Learning</a>
+            <div style="font-size: 0.7rem; color: var(--accent-color); font-weight: 800; text-transform: uppercase; margin-bottom: 0.5rem;">${escapeHtml(item.category)}</div>
+            <h4>${escapeHtml(item.title)}</h4>
+            <p>${escapeHtml(item.description)}</p>
+            <a href="${escapeHtml(href)}" class="btn-outline" style="text-decoration: none; display: inline-block; margin-top: 1rem;">Start Learning</a>
         `;
 
         card.addEventListener('click', (e) => {
             if (e.target.tagName !== 'A') {
-                window.location.href = `/prep/${item.id}`;
+                window.location.href = href;
             }
         });
 
@@ -183,13 +377,15 @@ function renderPrep(materials) {
 }
 
 function searchJobs() {
-    const query = document.getElementById('job-search').value.toLowerCase();
-    const filtered = allJobs.filter(job =>
-        job.title.toLowerCase().includes(query) ||
-        job.company.toLowerCase().includes(query) ||
-        job.requirements.toLowerCase().includes(query)
-    );
-    renderJobs(filtered);
+    // Matching happens server-side (or in the static index); start again
+    // from the first page
+    nextJobsCursor = null;
+    fetchJobs();
+    fetchPrep(document.getElementById('job-search').value.trim());
+}
+
+function loadMoreJobs() {
+    fetchJobs(true);
 }
 
 // Add event listener for enter key on search
@@ -0,0 +1,269 @@
+import base64
+import hashlib
+import itertools
+import json
+import os
+from contextlib import contextmanager
+
+from queries import PRACTICE_PAGE_SIZE, attach_skills, list_practice, practice_topics
+from read_model import load_prep
+
+SHARD_SIZE = 500
+DATA_DIR = 'data'
+# Search terms are bucketed into files by their first BUCKET_CHARS characters
+BUCKET_CHARS = 2
+
+JOBS_EXPORT = {
+    'name': 'jobs',
+    'table': 'jobs',
+    'order_by': 'posted_at DESC, id DESC',
+    # Few distinct values: counted per shard, inline in the index
+    'facets': ('location', 'type'),
+    # Many distinct values: a separate value -> shard bitset file, fetched
+    # only when a filter on that column is active
+    'lookups': ('company',),
+    'fts': 'jobs_fts',
+    'search_columns': ('title', 'company', 'requirements'),
+    'attach': attach_skills,
+}
+
+PREP_EXPORT = {
+    'name': 'prep',
+    'table': 'prep_materials',
+    'order_by': 'id',
+    'facets': ('category',),
+    # Roadmap and questions come decoded from the read model, as /prep/{id} serves them
+    'rows': lambda conn: load_prep(conn)[1].values(),
+    'fts': 'prep_fts',
+    'search_columns': ('title', 'description', 'notes'),
+}
+
+EXPORTS = (JOBS_EXPORT, PREP_EXPORT)
+
+
+def _count_facets(rows, columns):
+    facets = {column: {} for column in columns}
+    for row in rows:
+        for column in columns:
+            value = row[column]
+            facets[column][value] = facets[column].get(value, 0) + 1
+    return facets
+
+
+def _merge_facets(total, shard):
+    for column, counts in shard.items():
+        merged = total.setdefault(column, {})
+        for value, count in counts.items():
+            merged[value] = merged.get(value, 0) + count
+
+
+def _encode_bitset(bits, size):
+    # Bit i (byte i // 8, bit i % 8) is set when shard i holds the value
+    return base64.b64encode(bits.to_bytes((size + 7) // 8, 'little')).decode('ascii')
+
+
+def _write_json(write, path_prefix, value):
+    content = json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+    path = f"{path_prefix}-{hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]}.json"
+    write(path, content)
+    return path
+
+
+def export_table(conn, spec, write, shard_size=SHARD_SIZE):
+    """Stream one table into content-hashed shards plus an index manifest.
+
+    Rows are read in shard-sized batches, so peak memory is one shard no
+    matter how large the table is, and an unchanged shard keeps its file
+    name (and browser cache entry) across builds. The index lists shards in
+    order with per-shard facet counts, and points at one lookup file per
+    high-cardinality column, so main.js can fetch only the shards a filter
+    can match.
+
+    Rows are the table's columns in `order_by` order, unless the spec has a
+    `rows(conn)` function producing them. `write(relative_path, content)`
+    persists a file under docs/ and may skip ones whose content is
+    unchanged. Returns the relative paths written.
+    """
+    if 'rows' in spec:
+        source = iter(spec['rows'](conn))
+    else:
+        source = (dict(row) for row in conn.execute(f"SELECT * FROM {spec['table']} ORDER BY {spec['order_by']}"))
+    outputs = []
+    shards = []
+    facets = {}
+    lookups = {column: {} for column in spec.get('lookups', ())}
+    total = 0
+
+    while True:
+        rows = list(itertools.islice(source, shard_size))
+        if not rows:
+            break
+        if 'attach' in spec:
+            spec['attach'](conn, rows)
+        path = _write_json(write, f"{DATA_DIR}/{spec['name']}", rows)
+        outputs.append(path)
+
+        shard_facets = _count_facets(rows, spec['facets'])
+        _merge_facets(facets, shard_facets)
+        for column, bitsets in lookups.items():
+            for value in {row[column] for row in rows}:
+                bitsets[value] = bitsets.get(value, 0) | 1 << len(shards)
+        shards.append({'file': os.path.basename(path), 'count': len(rows), 'facets': shard_facets})
+        total += len(rows)
+
+    index = {
+        'version': hashlib.sha256(''.join(s['file'] for s in shards).encode('utf-8')).hexdigest()[:16],
+        'shard_size': shard_size,
+        'total': total,
+        'facets': facets,
+        'shards': shards,
+    }
+    if lookups:
+        index['lookups'] = {}
+        for column, bitsets in lookups.items():
+            path = _write_json(write, f"{DATA_DIR}/{spec['name']}-by-{column}",
+                               {value: _encode_bitset(bits, len(shards)) for value, bits in sorted(bitsets.items())})
+            index['lookups'][column] = os.path.basename(path)
+            outputs.append(path)
+    index_path = f"{DATA_DIR}/{spec['name']}-index.json"
+    write(index_path, json.dumps(index, separators=(',', ':'), ensure_ascii=False))
+    outputs.append(index_path)
+    return outputs
+
+
+def _write_bucket(spec, write, key, terms, postings, buckets, outputs):
+    content = json.dumps({'terms': terms, 'postings': postings}, separators=(',', ':'), ensure_ascii=False)
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+    path = f"{DATA_DIR}/search-{spec['name']}-{digest}.json"
+    write(path, content)
+    buckets[key] = os.path.basename(path)
+    outputs.append(path)
+
+
+def export_search_index(conn, spec, write):
+    """Write a prefix-bucketed inverted index for client-side search.
+
+    Terms come from the table's FTS5 index through an fts5vocab view, so
+    the browser sees exactly the server's unicode61 tokenization. Postings
+    are row ordinals in export order (ordinal // shard_size is the shard,
+    ordinal % shard_size the row in it), delta-encoded. SQLite sorts the
+    (term, ordinal) pairs, so the index is written one bucket at a time and
+    memory stays bounded by the largest bucket.
+    """
+    name = spec['name']
+    conn.execute(f"DROP TABLE IF EXISTS temp.export_vocab_{name}")
+    conn.execute(f"CREATE VIRTUAL TABLE temp.export_vocab_{name} USING fts5vocab(main, {spec['fts']}, instance)")
+    conn.execute(f"DROP TABLE IF EXISTS temp.export_order_{name}")
+    # id must be the rowid: the join below probes it once per term instance
+    conn.execute(f"CREATE TEMP TABLE export_order_{name} (id INTEGER PRIMARY KEY, ordinal INTEGER NOT NULL)")
+    conn.execute(f'''
+        INSERT INTO export_order_{name} (id, ordinal)
+        SELECT id, ROW_NUMBER() OVER (ORDER BY {spec['order_by']}) - 1
+        FROM main.{spec['table']}
+    ''')
+    placeholders = ', '.join('?' for _ in spec['search_columns'])
+    cursor = conn.execute(f'''
+        SELECT DISTINCT v.term, o.ordinal
+        FROM export_vocab_{name} v
+        JOIN export_order_{name} o ON o.id = v.doc
+        WHERE v.col IN ({placeholders})
+        ORDER BY v.term, o.ordinal
+    ''', spec['search_columns'])
+
+    outputs = []
+    buckets = {}
+    key = None
+    terms, postings = [], []
+    term, last = None, 0
+    while True:
+        batch = cursor.fetchmany(10000)
+        if not batch:
+            break
+        for row_term, ordinal in batch:
+            if row_term != term:
+                if row_term[:BUCKET_CHARS] != key:
+                    if terms:
+                        _write_bucket(spec, write, key, terms, postings, buckets, outputs)
+                    key, terms, postings = row_term[:BUCKET_CHARS], [], []
+                term, last = row_term, 0
+                terms.append(term)
+                postings.append([])
+            postings[-1].append(ordinal - last)
+            last = ordinal
+    if terms:
+        _write_bucket(spec, write, key, terms, postings, buckets, outputs)
+    conn.execute(f"DROP TABLE temp.export_vocab_{name}")
+    conn.execute(f"DROP TABLE temp.export_order_{name}")
+
+    index = {
+        'version': hashlib.sha256(''.join(sorted(buckets.values())).encode('utf-8')).hexdigest()[:16],
+        'bucket_chars': BUCKET_CHARS,
+        'buckets': buckets,
+    }
+    index_path = f"{DATA_DIR}/search-{name}-index.json"
+    write(index_path, json.dumps(index, separators=(',', ':'), ensure_ascii=False))
+    outputs.append(index_path)
+    return outputs
+
+
+def export_practice(conn, write, page_size=PRACTICE_PAGE_SIZE):
+    """Write each practice topic as content-hashed pages plus an index.
+
+    The pages are exactly what /api/practice serves, so practice.html loads
+    a topic shard by shard on the flat site the same way it pages the API.
+    """
+    outputs = []
+    topics = practice_topics(conn)
+    for topic in topics:
+        topic['shards'] = []
+        cursor = None
+        while True:
+            items, cursor = list_practice(conn, topic['topic'], cursor=cursor, limit=page_size)
+            content = json.dumps(items, separators=(',', ':'), ensure_ascii=False)
+            digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+            path = f"{DATA_DIR}/practice-{digest}.json"
+            write(path, content)
+            outputs.append(path)
+            topic['shards'].append(os.path.basename(path))
+            if cursor is None:
+                break
+
+    index = {
+        'version': hashlib.sha256(''.join(f for t in topics for f in t['shards']).encode('utf-8')).hexdigest()[:16],
+        'page_size': page_size,
+        'topics': topics,
+    }
+    index_path = f"{DATA_DIR}/practice-index.json"
+    write(index_path, json.dumps(index, separators=(',', ':'), ensure_ascii=False))
+    outputs.append(index_path)
+    return outputs
+
+
+@contextmanager
+def read_snapshot(conn):
+    """Read everything inside the block from one snapshot of the database.
+
+    A deferred BEGIN pins the snapshot at its first read, so an ingest
+    committing mid-export cannot leave shards and search indexes describing
+    different rows. Inside an open transaction this adds nothing.
+    """
+    if conn.in_transaction:
+        yield
+        return
+    conn.execute("BEGIN")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def export_all(conn, write, shard_size=SHARD_SIZE):
+    outputs = []
+    with read_snapshot(conn):
+        for spec in EXPORTS:
+            outputs.extend(export_table(conn, spec, write, shard_size))
+            outputs.extend(export_search_index(conn, spec, write))
+        outputs.extend(export_practice(conn, write))
+    return outputs
@@ -0,0 +1,129 @@
+import asyncio
+import io
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import repository  # noqa: E402
+
+# Set in CI (LMT_REQUIRE_POSTGRES=1): an unreachable PostgreSQL backend fails
+# the run instead of skipping its half of the suite
+REQUIRE_POSTGRES = os.environ.get('LMT_REQUIRE_POSTGRES') == '1'
+
+# Added on top of the seed data: a second page of jobs, lower-case skills
+# and a salary in another currency
+FEED = '''\
+{"title": "Platform Engineer", "company": "Google", "location": "Remote", "type": "Full-time", "posted_date": "3 hours ago", "salary": "$120k - $160k", "requirements": "python, Go, kubernetes"}
+{"title": "Data Engineer", "company": "Stripe", "location": "Remote", "type": "Contract", "posted_date": "6 hours ago", "salary": "€70k - €90k", "requirements": "SQL, Spark, PYTHON"}
+{"title": "QA Intern", "company": "StartupX", "location": "Pune, India", "type": "Internship", "posted_date": "2 weeks ago", "requirements": "Selenium, Java"}
+'''
+
+# Prep JSON with a null roadmap step and a question that is not an object
+PREP_WITH_GAPS = ('Aptitude', 'Odd JSON', '["Read", null, "Practice"]',
+                  '["stray text", {"q": "Why?", "a": "Because"}, {"a": "no question"}]')
+
+
+class SyncRepository:
+    """A Repository whose coroutine methods are run to completion on one loop.
+
+    asyncpg pools belong to the loop that created them, so every call for a
+    given repository goes through the same loop.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.name = repo.name
+        self.loop = asyncio.new_event_loop()
+
+    def __getattr__(self, name):
+        method = getattr(self.repo, name)
+        return lambda *args, **kwargs: self.loop.run_until_complete(method(*args, **kwargs))
+
+    def shutdown(self):
+        self.loop.run_until_complete(self.repo.close())
+        self.loop.close()
+
+
+@pytest.fixture(scope='session')
+def seed_path(tmp_path_factory):
+    # One SQLite file both backends start from, so they hold the same rows and ids
+    path = str(tmp_path_factory.mktemp('seed') / 'seed.db')
+    repo = SyncRepository(repository.SQLiteRepository(path, readers=1))
+    try:
+        repo.ingest(io.StringIO(FEED), 'jsonl')
+    finally:
+        repo.shutdown()
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO prep_materials (category, title, roadmap, questions) VALUES (?, ?, ?, ?)",
+                     PREP_WITH_GAPS)
+    conn.close()
+    return path
+
+
+@pytest.fixture(scope='session')
+def database_url(tmp_path_factory):
+    """LMT_DATABASE_URL, else an embedded server (pgserver), else a testcontainer."""
+    if repository.asyncpg is None:
+        yield None
+        return
+    if repository.DATABASE_URL:
+        yield repository.DATABASE_URL
+        return
+    try:
+        import pgserver
+    except ImportError:
+        pgserver = None
+    if pgserver is not None:
+        # Stopped (and its data dir removed) when the test process exits
+        server = pgserver.get_server(str(tmp_path_factory.mktemp('pgdata')), cleanup_mode='delete')
+        yield server.get_uri()
+        return
+    try:
+        from testcontainers.postgres import PostgresContainer
+    except ImportError:
+        yield None
+        return
+    try:
+        container = PostgresContainer('postgres:16-alpine', driver=None).start()
+    except Exception:  # no container runtime here
+        yield None
+        return
+    try:
+        yield container.get_connection_url()
+    finally:
+        container.stop()
+
+
+def _open(storage, seed_path, path, database_url):
+    if storage == 'sqlite':
+        shutil.copy(seed_path, path)
+        return SyncRepository(repository.SQLiteRepository(path, readers=2))
+    if database_url is None:
+        reason = "PostgreSQL needs asyncpg plus LMT_DATABASE_URL, pgserver or testcontainers"
+        if REQUIRE_POSTGRES:
+            pytest.fail(reason)
+        pytest.skip(reason)
+    repo = SyncRepository(repository.PostgresRepository(database_url))
+    repo.load_sqlite(seed_path)
+    return repo
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def repo(request, seed_path, tmp_path, database_url):
+    """Each backend in turn, loaded with the seed data."""
+    repo = _open(request.param, seed_path, str(tmp_path / 'repo.db'), database_url)
+    yield repo
+    repo.shutdown()
+
+
+@pytest.fixture
+def reference(seed_path, tmp_path, database_url):
+    """A SQLite copy of the same data that `repo` results are compared with."""
+    repo = _open('sqlite', seed_path, str(tmp_path / 'reference.db'), database_url)
+    yield repo
+    repo.shutdown()
@@ -0,0 +1,75 @@
+import shutil
+import warnings
+
+import pytest
+
+with warnings.catch_warnings():
+    # TestClient and the app's on_event hook both warn on this FastAPI
+    warnings.simplefilter('ignore', DeprecationWarning)
+    from fastapi.testclient import TestClient
+    import app
+
+import queries
+import read_model
+import repository
+from page_cache import PageCache
+
+
+@pytest.fixture
+def client(seed_path, tmp_path, monkeypatch):
+    # A copy of the seed data and empty caches in place of horizon.db and
+    # whatever earlier tests cached
+    path = str(tmp_path / 'api.db')
+    shutil.copy(seed_path, path)
+    repo = repository.SQLiteRepository(path, readers=2)
+    monkeypatch.setattr(app, 'repo', repo)
+    monkeypatch.setattr(app, 'page_cache', PageCache())
+    monkeypatch.setattr(app, 'api_cache', PageCache())
+    monkeypatch.setattr(app, 'prep_model', read_model.PrepReadModel())
+    yield TestClient(app.app)
+    repo.db.close()
+
+
+@pytest.mark.parametrize('query', [
+    'min_salary=1' + '0' * 30 + '&currency=INR',
+    f'max_salary={2 ** 63}&currency=USD',
+    'min_salary=-1&currency=USD',
+    'posted_since=1' + '0' * 30,
+    'posted_since=-5',
+])
+def test_jobs_rejects_out_of_range_numbers(client, query):
+    assert client.get(f'/api/jobs?{query}').status_code == 422
+
+
+@pytest.mark.parametrize('query', ['min_salary=100000', 'max_salary=100000'])
+def test_jobs_salary_bounds_need_a_currency(client, query):
+    response = client.get(f'/api/jobs?{query}')
+    assert response.status_code == 400
+    assert 'currency' in response.json()['detail']
+
+
+def test_jobs_salary_bounds_in_one_currency(client):
+    response = client.get(f'/api/jobs?min_salary=150000&max_salary={2 ** 63 - 1}&currency=usd&fields=title')
+    assert response.status_code == 200
+    assert [item['title'] for item in response.json()['items']] == ['Platform Engineer', 'Data Scientist']
+
+
+@pytest.mark.parametrize('path', [
+    '/api/jobs?cursor=' + queries.encode_cursor(2 ** 64, 1),
+    '/api/practice?topic=ARRAYS&cursor=' + queries.encode_cursor(10 ** 30),
+])
+def test_out_of_range_cursor_is_a_bad_request(client, path):
+    response = client.get(path)
+    assert response.status_code == 400
+    assert 'Invalid cursor' in response.json()['detail']
+
+
+@pytest.mark.parametrize('path, status', [('/companies', 200), ('/practice', 200), ('/prep/1', 200),
+                                          ('/prep/999999', 404)])
+def test_pages_render_and_cache(client, path, status):
+    first = client.get(path)
+    assert first.status_code == status
+    if status == 200:
+        assert '</html>' in first.text
+        again = client.get(path, headers={'If-None-Match': first.headers['etag']})
+        assert again.status_code == 304
@@ -0,0 +1,26 @@
+import pytest
+
+import assets
+
+
+@pytest.mark.parametrize('source, minified', [
+    ('a { color: red; }', 'a{color: red}'),
+    ('a::after { content: ";}"; }', 'a::after{content: ";}"}'),
+    ("a::after { content: ';  }' }", "a::after{content: ';  }'}"),
+    ('a { background: url(x;}y.png); }', 'a{background: url(x;}y.png)}'),
+    ('a { background: URL("a ;} b.png") ; }', 'a{background: URL("a ;} b.png")}'),
+    ('a { color: red; /* note */ }', 'a{color: red}'),
+    ('a /* x */ b { margin: 0 /* y */ auto; }', 'a b{margin: 0 auto}'),
+    ('a::before { content: "/* kept */"; }', 'a::before{content: "/* kept */"}'),
+])
+def test_minify_css(source, minified):
+    assert assets.minify_css(source) == minified
+
+
+
+def test_minify_css_style_sheet():
+    with open(f'{assets.STATIC_DIR}/css/style.css') as f:
+        source = f.read()
+    minified = assets.minify_css(source)
+    assert len(minified) < len(source)
+    assert minified.count('{') == source.count('{')
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+import database
+import read_model
+
+ODD_ROADMAP = '["Read", null, "Practice"]'
+ODD_QUESTIONS = '["stray text", {"q": "Why?", "a": "Because"}, {"a": "no question"}]'
+
+
+def odd_prep(conn):
+    _, details = read_model.load_prep(conn)
+    return next(prep for prep in details.values() if prep['title'] == 'Odd JSON')
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    database.init_db(conn)
+    yield conn
+    conn.close()
+
+
+def test_prep_writes_skip_null_steps_and_non_object_questions(conn):
+    conn.execute("INSERT INTO prep_materials (category, title, roadmap, questions) VALUES ('X', 'Odd JSON', ?, ?)",
+                 (ODD_ROADMAP, ODD_QUESTIONS))
+    prep = odd_prep(conn)
+    assert prep['roadmap'] == ['Read', 'Practice']
+    assert prep['questions'] == [{'q': 'Why?', 'a': 'Because'}]
+
+    conn.execute("UPDATE prep_materials SET roadmap = '[null]', questions = '[1, null]' WHERE title = 'Odd JSON'")
+    prep = odd_prep(conn)
+    assert (prep['roadmap'], prep['questions']) == ([], [])
+
+
+def test_read_model_backfill_skips_null_elements():
+    # A row written before the read model existed is decoded by the migration
+    conn = sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    for version, step in database.MIGRATIONS:
+        if version < 7:
+            step(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+    conn.execute("INSERT INTO prep_materials (category, title, roadmap, questions) VALUES ('X', 'Odd JSON', ?, ?)",
+                 (ODD_ROADMAP, ODD_QUESTIONS))
+    conn.commit()
+    database.init_db(conn)
+    assert database.schema_version(conn) == database.SCHEMA_VERSION
+    assert odd_prep(conn)['roadmap'] == ['Read', 'Practice']
+    conn.close()
@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+
+import datastore
+
+
+def test_locked_database_is_not_read_as_immutable(tmp_path, monkeypatch):
+    monkeypatch.setattr(datastore, 'BUSY_TIMEOUT', 0.05)
+    path = str(tmp_path / 'locked.db')
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("CREATE TABLE t (x)")
+    writer.execute("BEGIN EXCLUSIVE")
+    writer.execute("INSERT INTO t VALUES (1)")
+    db = datastore.Database(path, readers=1)
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            with db.reader():
+                pass
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+        db.close()
+
+
+def test_reader_sees_committed_writes(tmp_path):
+    path = str(tmp_path / 'live.db')
+    db = datastore.Database(path, readers=1)
+    try:
+        with db.writer() as conn:
+            conn.execute("CREATE TABLE t (x)")
+        with db.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        with db.writer() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+        # The same pooled reader, not an immutable snapshot of the first read
+        with db.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    finally:
+        db.close()
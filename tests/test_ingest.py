@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import database
+import ingest
+from datastore import Database
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def job(n, **fields):
+    return dict({'title': f'Welder {n}', 'company': 'Forge', 'location': 'Remote', 'type': 'Full-time'}, **fields)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'ingest.db'))
+    database.init_db(conn)
+    yield conn
+    conn.close()
+
+
+def job_line(**overrides):
+    # Raw JSON text, so NaN, 1e400 and huge integers arrive exactly as a feed sends them
+    fields = ', '.join(f'"{key}": {value}' for key, value in overrides.items())
+    return '{"title": "Smith", "company": "Forge", "location": "Remote", "type": "Full-time"' + \
+        (', ' + fields if fields else '') + '}\n'
+
+
+@pytest.mark.parametrize('overrides, error', [
+    ({'posted_at': 'NaN'}, 'posted_at'),
+    ({'posted_at': 'Infinity'}, 'posted_at'),
+    ({'posted_at': '99999999999999999999999'}, 'posted_at'),
+    ({'posted_at': '"99999999999999999999999"'}, 'posted_at'),
+    ({'posted_at': '-1'}, 'posted_at'),
+    ({'posted_at': '"0001-01-01T00:00:00"'}, 'posted_at'),
+    ({'posted_date': '"99999999999999999999 weeks ago"'}, 'posted_date'),
+    ({'salary_min': '1e400'}, 'salary_min'),
+    ({'salary_min': 'NaN'}, 'salary_min'),
+    ({'salary_max': '"1e30"'}, 'salary_max'),
+    ({'salary_max': str(2 ** 63)}, 'salary_max'),
+])
+def test_out_of_range_numbers_are_invalid_records(conn, overrides, error):
+    feed = io.StringIO(job_line(**overrides) + json.dumps(job(1)) + '\n')
+    report = ingest.ingest_stream(conn, feed, 'jsonl')
+    assert (report['read'], report['upserted'], report['invalid']) == (2, 1, 1)
+    assert error in report['errors'][0]
+    assert conn.execute("SELECT title FROM jobs WHERE company = 'Forge'").fetchall() == [('Welder 1',)]
+
+
+def test_numbers_in_range_are_kept(conn):
+    feed = io.StringIO(job_line(posted_at='1700000000.5', salary_min='"90000"', salary_max=str(2 ** 63 - 1)))
+    assert ingest.ingest_stream(conn, feed, 'jsonl')['invalid'] == 0
+    assert conn.execute("SELECT posted_at, salary_min, salary_max FROM jobs WHERE company = 'Forge'").fetchone() == \
+        (1700000000, 90000, 2 ** 63 - 1)
+
+
+def test_unstorable_salary_text_is_left_unparsed(conn):
+    feed = io.StringIO(job_line(salary=json.dumps('₹' + '9' * 30 + ' cr')))
+    assert ingest.ingest_stream(conn, feed, 'jsonl')['invalid'] == 0
+    assert conn.execute("SELECT salary_min, salary_max FROM jobs WHERE company = 'Forge'").fetchone() == (None, None)
+
+
+def test_fts_triggers_restored_after_killed_ingest(tmp_path):
+    path = str(tmp_path / 'crash.db')
+    conn = sqlite3.connect(path)
+    database.init_db(conn)
+    conn.close()
+
+    # Two full batches are committed with the triggers dropped, then the process dies
+    script = textwrap.dedent(f'''
+        import json, os, sqlite3, sys
+        sys.path.insert(0, {ROOT!r})
+        import ingest
+
+        def feed():
+            for n in range(4):
+                yield json.dumps({{"title": f"Welder {{n}}", "company": "Forge",
+                                  "location": "Remote", "type": "Full-time"}}) + "\\n"
+            os._exit(1)
+
+        ingest.ingest_stream(sqlite3.connect({path!r}), feed(), "jsonl", batch_size=2)
+    ''')
+    assert subprocess.run([sys.executable, '-c', script]).returncode == 1
+
+    conn = sqlite3.connect(path)
+    assert database.jobs_fts_triggers_missing(conn)
+    assert database.needs_init(conn)
+    conn.close()
+
+    db = Database(path, readers=1)
+    try:
+        db.initialize(database.init_db, database.needs_init)
+        with db.reader() as conn:
+            assert not database.jobs_fts_triggers_missing(conn)
+            hits = conn.execute("SELECT COUNT(*) FROM jobs_fts WHERE jobs_fts MATCH 'welder'").fetchone()[0]
+            assert hits == 4
+        with db.writer() as conn:
+            conn.execute(ingest.UPSERT_SQL, ingest.normalize(job(9, requirements='Brazing')))
+        with db.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM jobs_fts WHERE jobs_fts MATCH 'brazing'").fetchone()[0] == 1
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+
+import page_cache
+from page_cache import PageCache
+
+
+def run_concurrently(cache, count, produce, key='page', version=1):
+    async def main():
+        return await asyncio.gather(*(cache.fetch(key, version, produce) for _ in range(count)),
+                                    return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_concurrent_misses_produce_once():
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return '<p>page</p>'
+
+    cache = PageCache()
+    pages = run_concurrently(cache, 20, produce)
+    assert len(calls) == 1
+    assert all(page is pages[0] for page in pages)
+    assert pages[0].bodies['identity'] == b'<p>page</p>'
+    assert cache.get('page', 1) is pages[0]
+    assert not cache._inflight
+
+
+def test_compression_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    original = page_cache.CachedPage
+
+    def cached_page(*args):
+        threads.append(threading.get_ident())
+        return original(*args)
+    monkeypatch.setattr(page_cache, 'CachedPage', cached_page)
+
+    async def produce():
+        return 'body'
+    run_concurrently(PageCache(), 3, produce)
+    assert len(threads) == 1 and threads[0] != threading.get_ident()
+
+
+def test_nothing_to_show_is_not_cached():
+    async def produce():
+        return None
+    cache = PageCache()
+    assert run_concurrently(cache, 3, produce) == [None] * 3
+    assert cache.get('page', 1) is None
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise LookupError('gone')
+
+    cache = PageCache()
+    errors = run_concurrently(cache, 5, produce)
+    assert len(calls) == 1
+    assert all(isinstance(error, LookupError) for error in errors)
+    assert cache.get('page', 1) is None and not cache._inflight
+
+
+def test_a_new_version_is_produced_again():
+    bodies = iter(['one', 'two'])
+
+    async def produce():
+        return next(bodies)
+    cache = PageCache()
+    assert run_concurrently(cache, 1, produce, version=1)[0].bodies['identity'] == b'one'
+    assert run_concurrently(cache, 1, produce, version=2)[0].bodies['identity'] == b'two'
+
+
+def test_cancelled_waiter_leaves_the_page_to_the_others():
+    async def main():
+        cache = PageCache()
+        started = asyncio.Event()
+
+        async def produce():
+            started.set()
+            await asyncio.sleep(0.02)
+            return 'body'
+        first = asyncio.ensure_future(cache.fetch('page', 1, produce))
+        second = asyncio.ensure_future(cache.fetch('page', 1, produce))
+        await started.wait()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+    assert asyncio.run(main()).bodies['identity'] == b'body'
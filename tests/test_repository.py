@@ -0,0 +1,240 @@
+"""Every Repository backend must return what the SQLite one returns.
+
+Each test runs once per backend (the `repo` fixture) and checks the result
+both on its own terms and against `reference`, a SQLite copy of the same
+data. PostgreSQL comes from LMT_DATABASE_URL, pgserver or testcontainers
+(see conftest.py); CI sets LMT_REQUIRE_POSTGRES=1 so it is never skipped.
+"""
+import io
+import json
+
+import pytest
+
+import datastore
+import queries
+import repository
+
+ALL_JOB_FIELDS = queries.JOB_FIELDS
+
+
+def walk_jobs(repo, limit, **filters):
+    pages = []
+    cursor = None
+    while True:
+        items, cursor = repo.list_jobs(cursor=cursor, limit=limit, fields=('id', 'posted_at'), **filters)
+        pages.append(([item['id'] for item in items], cursor))
+        if cursor is None:
+            return pages
+
+
+def walk_practice(repo, topic, difficulty):
+    pages = []
+    cursor = None
+    while True:
+        items, cursor = repo.list_practice(topic, difficulty=difficulty, cursor=cursor, limit=3)
+        pages.append((items, cursor))
+        if cursor is None:
+            return pages
+
+
+def without_rank(results):
+    # Scores and snippets come from bm25()/snippet() on SQLite and
+    # ts_rank_cd()/ts_headline() on PostgreSQL; the hits themselves must agree
+    return {name: dict(scope, items=sorted(({key: value for key, value in item.items()
+                                              if key not in ('score', 'snippet')} for item in scope['items']),
+                                            key=lambda item: item['id']))
+            for name, scope in results['results'].items()}
+
+
+def test_repository_is_abstract():
+    with pytest.raises(TypeError):
+        repository.Repository()
+
+
+def test_create_repository_rejects_unknown_storage():
+    with pytest.raises(ValueError):
+        repository.create_repository('mysql')
+
+
+def test_data_version_moves_on_write(repo, monkeypatch):
+    monkeypatch.setattr(datastore, 'VERSION_TTL', 0)
+    monkeypatch.setattr(repository, 'VERSION_TTL', 0)
+    before = repo.data_version()
+    assert repo.data_version() == before
+    repo.ingest(io.StringIO('{"title": "SRE", "company": "Meta", "location": "Remote", "type": "Full-time"}\n'),
+                'jsonl')
+    assert repo.data_version() != before
+
+
+def test_list_jobs_newest_first(repo, reference):
+    items, cursor = repo.list_jobs(limit=100, fields=ALL_JOB_FIELDS)
+    assert cursor is None
+    assert len(items) == 13
+    keys = [(item['posted_at'], item['id']) for item in items]
+    assert keys == sorted(keys, reverse=True)
+    assert items == reference.list_jobs(limit=100, fields=ALL_JOB_FIELDS)[0]
+
+
+@pytest.mark.parametrize('filters', [
+    {'company': 'Google'},
+    {'location': 'Remote'},
+    {'job_type': 'Contract'},
+    {'currency': 'usd', 'min_salary': 150_000},
+    {'currency': 'INR', 'max_salary': 1_500_000},
+    {'q': 'engineer'},
+    {'q': 'python'},
+    {'company': 'Google', 'q': 'engineer'},
+])
+def test_list_jobs_filters(repo, reference, filters):
+    items, _ = repo.list_jobs(limit=100, **filters)
+    assert items
+    assert (items, None) == reference.list_jobs(limit=100, **filters)
+
+
+def test_list_jobs_posted_since(repo, reference):
+    newest = repo.list_jobs(limit=1, fields=('posted_at',))[0][0]['posted_at']
+    items, _ = repo.list_jobs(posted_since=newest, fields=('id', 'posted_at'))
+    assert items and all(item['posted_at'] >= newest for item in items)
+    assert items == reference.list_jobs(posted_since=newest, fields=('id', 'posted_at'))[0]
+
+
+def test_list_jobs_fields(repo, reference):
+    items, _ = repo.list_jobs(limit=3, fields=('title', 'skills'))
+    assert [set(item) for item in items] == [{'title', 'skills'}] * 3
+    assert items == reference.list_jobs(limit=3, fields=('title', 'skills'))[0]
+
+
+@pytest.mark.parametrize('filters', [{}, {'job_type': 'Full-time'}, {'location': 'Remote'}])
+def test_list_jobs_cursor_pages(repo, reference, filters):
+    pages = walk_jobs(repo, 3, **filters)
+    ids = [job_id for page, _ in pages for job_id in page]
+    everything = [item['id'] for item in repo.list_jobs(limit=100, fields=('id',), **filters)[0]]
+    assert ids == everything
+    assert len(ids) == len(set(ids))
+    # The cursors themselves are interchangeable between backends
+    assert pages == walk_jobs(reference, 3, **filters)
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', queries.encode_cursor(2 ** 63, 1),
+                                    queries.encode_cursor(1, -2 ** 63 - 1), queries.encode_cursor(1e400, 1)])
+def test_list_jobs_invalid_cursor(repo, cursor):
+    with pytest.raises(queries.InvalidCursor):
+        repo.list_jobs(cursor=cursor)
+
+
+def test_list_practice_invalid_cursor(repo):
+    with pytest.raises(queries.InvalidCursor):
+        repo.list_practice('ARRAYS', cursor=queries.encode_cursor(10 ** 30))
+
+
+@pytest.mark.parametrize('skill', ['python', 'Python', 'PYTHON', ' python '])
+def test_list_jobs_skill_is_case_insensitive(repo, reference, skill):
+    items, _ = repo.list_jobs(skill=skill, fields=('title', 'skills'))
+    assert sorted(item['title'] for item in items) == ['Data Engineer', 'Platform Engineer', 'Software Engineer']
+    assert items == reference.list_jobs(skill=skill, fields=('title', 'skills'))[0]
+
+
+def test_list_jobs_unknown_skill(repo):
+    assert repo.list_jobs(skill='cobol') == ([], None)
+
+
+@pytest.mark.parametrize('q, scope', [
+    ('engineer', None),
+    ('eng', 'jobs'),
+    ('quant', 'all'),
+    ('python', 'jobs'),
+    ('', None),
+    ('zzzz', 'prep'),
+])
+def test_search(repo, reference, q, scope):
+    facets = ('company', 'type', 'category')
+    results = repo.search(q, scope=scope, facets=facets)
+    expected = reference.search(q, scope=scope, facets=facets)
+    assert results['query'] == q
+    assert without_rank(results) == without_rank(expected)
+
+
+def test_search_limit(repo):
+    items = repo.search('engineer', scope='jobs', limit=2)['results']['jobs']['items']
+    assert len(items) == 2
+
+
+def test_load_prep(repo, reference):
+    summaries, details = repo.load_prep()
+    assert summaries and set(details) == {summary['id'] for summary in summaries}
+    assert all(isinstance(prep['roadmap'], list) for prep in details.values())
+    assert (summaries, details) == reference.load_prep()
+    gaps = next(prep for prep in details.values() if prep['title'] == 'Odd JSON')
+    assert gaps['roadmap'] == ['Read', 'Practice']
+    assert gaps['questions'] == [{'q': 'Why?', 'a': 'Because'}]
+
+
+def test_list_companies(repo, reference):
+    companies = repo.list_companies()
+    assert companies and set(companies[0]) == set(queries.COMPANY_FIELDS)
+    assert companies == reference.list_companies()
+    assert repo.list_companies(fields=('id', 'name')) == reference.list_companies(fields=('id', 'name'))
+
+
+def test_practice_topics(repo, reference):
+    topics = repo.practice_topics()
+    assert topics[0]['topic'] == 'NUMBERS'
+    assert all(entry['total'] == sum(entry['difficulties'].values()) for entry in topics)
+    assert topics == reference.practice_topics()
+
+
+@pytest.mark.parametrize('difficulty', [None, 'Medium'])
+def test_list_practice_cursor_pages(repo, reference, difficulty):
+    pages = walk_practice(repo, 'ARRAYS', difficulty)
+    ids = [item['id'] for items, _ in pages for item in items]
+    assert ids == sorted(ids) and len(ids) == (4 if difficulty else 8)
+    assert pages == walk_practice(reference, 'ARRAYS', difficulty)
+
+
+def test_list_practice_unknown_topic(repo):
+    assert repo.list_practice('NO SUCH TOPIC') == (None, None)
+    # A known topic with nothing left past the cursor is an empty page, not unknown
+    last = repo.list_practice('DP', limit=100)[0][-1]['id']
+    assert repo.list_practice('DP', cursor=queries.encode_cursor(last)) == ([], None)
+
+
+def feed(*records):
+    return io.StringIO(''.join(json.dumps(record) + '\n' for record in records))
+
+
+def test_ingest_dedupes_on_natural_key(repo, reference):
+    records = (
+        {'title': 'SRE', 'company': 'Meta', 'location': 'Remote', 'type': 'Full-time',
+         'salary': '$100k - $120k', 'requirements': 'Linux, Python'},
+        {'title': 'SRE', 'company': 'Meta', 'location': 'Remote', 'type': 'Contract',
+         'salary': '$130k - $150k', 'requirements': 'Go, Kubernetes'},
+        {'title': 'No company', 'location': 'Remote', 'type': 'Full-time'},
+        # Replaces a seed posting, skills included
+        {'title': 'Software Engineer', 'company': 'Google', 'location': 'Bangalore, India', 'type': 'Full-time',
+         'requirements': 'Rust, Go'},
+    )
+    for backend in (repo, reference):
+        report = backend.ingest(feed(*records), 'jsonl', batch_size=10)
+        assert {key: report[key] for key in ('read', 'upserted', 'invalid', 'batches')} == \
+            {'read': 4, 'upserted': 3, 'invalid': 1, 'batches': 1}
+
+    items, _ = repo.list_jobs(company='Meta', fields=ALL_JOB_FIELDS)
+    sre = [item for item in items if item['title'] == 'SRE']
+    assert len(sre) == 1
+    # Within a batch the last record wins
+    assert (sre[0]['type'], sre[0]['salary_min'], sre[0]['skills']) == ('Contract', 130_000, ['Go', 'Kubernetes'])
+    titles = [item['title'] for item in repo.list_jobs(skill='PYTHON', fields=('title',))[0]]
+    assert 'Software Engineer' not in titles and 'SRE' not in titles
+    assert repo.list_jobs(limit=100, fields=ALL_JOB_FIELDS) == reference.list_jobs(limit=100, fields=ALL_JOB_FIELDS)
+
+
+def test_ingest_across_batches(repo, reference):
+    records = [{'title': f'Engineer {n % 4}', 'company': 'Batchco', 'location': 'Remote', 'type': 'Full-time',
+                'posted_at': 1_700_000_000 + n, 'requirements': f'Skill{n}'} for n in range(10)]
+    for backend in (repo, reference):
+        report = backend.ingest(feed(*records), 'jsonl', batch_size=3)
+        assert (report['read'], report['batches']) == (10, 4)
+    items, _ = repo.list_jobs(company='Batchco', fields=('title', 'posted_at', 'skills'))
+    assert [item['title'] for item in items] == ['Engineer 1', 'Engineer 0', 'Engineer 3', 'Engineer 2']
+    assert items[0]['skills'] == ['Skill9']
+    assert items == reference.list_jobs(company='Batchco', fields=('title', 'posted_at', 'skills'))[0]
@@ -0,0 +1,66 @@
+import json
+import sqlite3
+
+import pytest
+
+import database
+import static_export
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'export.db')
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    database.init_db(conn)
+    conn.close()
+    return path
+
+
+def ordinals(bucket):
+    for postings in bucket['postings']:
+        ordinal = 0
+        for delta in postings:
+            ordinal += delta
+            yield ordinal
+
+
+def test_export_reads_one_snapshot(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    files = {}
+
+    def write(output, content):
+        files[output] = content
+        if len(files) == 1:
+            # An ingest commits while the first shard is being written
+            with sqlite3.connect(path) as other:
+                other.execute('''
+                    INSERT INTO jobs (title, company, location, type, posted_date, posted_at, requirements)
+                    VALUES ('Zyzzyva Tamer', 'Late', 'Remote', 'Full-time', 'Today', 9999999999, 'Zyzzyva')
+                ''')
+
+    static_export.export_all(conn, write, shard_size=4)
+    assert not conn.in_transaction
+    conn.close()
+
+    index = json.loads(files['data/jobs-index.json'])
+    shards = [json.loads(files[f"data/{shard['file']}"]) for shard in index['shards']]
+    assert index['total'] == sum(len(rows) for rows in shards) == 10
+    assert 'Zyzzyva Tamer' not in {row['title'] for rows in shards for row in rows}
+
+    search = json.loads(files['data/search-jobs-index.json'])
+    buckets = [json.loads(files[f'data/{name}']) for name in search['buckets'].values()]
+    assert not any(term.startswith('zyzzyva') for bucket in buckets for term in bucket['terms'])
+    assert max(ordinal for bucket in buckets for ordinal in ordinals(bucket)) < index['total']
+
+
+def test_export_joins_an_open_transaction(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("BEGIN")
+    static_export.export_all(conn, lambda output, content: None)
+    # The caller's snapshot is the caller's to end
+    assert conn.in_transaction
+    conn.rollback()
+    conn.close()